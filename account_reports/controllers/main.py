@@ -5,6 +5,7 @@ from odoo import http
 from odoo.http import content_disposition, request
 from odoo.addons.web.controllers.main import _serialize_exception
 from odoo.tools import html_escape
+from werkzeug.wsgi import wrap_file
 
 import json
 
@@ -27,13 +28,14 @@ class FinancialReportController(http.Controller):
         try:
             if output_format == 'xlsx':
                 response = request.make_response(
-                    None,
+                    wrap_file(request.httprequest.environ, report_obj.get_xlsx_file(options)),
                     headers=[
                         ('Content-Type', account_report_model.get_export_mime_type('xlsx')),
                         ('Content-Disposition', content_disposition(report_name + '.xlsx'))
                     ]
                 )
-                response.stream.write(report_obj.get_xlsx(options))
+                # Stream the temporary file to the user instead of loading it in memory.
+                response.direct_passthrough = True
             if output_format == 'pdf':
                 response = request.make_response(
                     report_obj.get_pdf(options),
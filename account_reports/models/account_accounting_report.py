@@ -6,6 +6,7 @@ from odoo.tools.misc import format_date
 from odoo.osv import expression
 
 from collections import defaultdict, namedtuple
+import hashlib
 
 HierarchyDetail = namedtuple('HierarchyDetail', ['field', 'foldable', 'lazy', 'section_total', 'namespan'])
 ColumnDetail = namedtuple('ColumnDetail', ['name', 'classes', 'getter', 'formatter'])
@@ -54,6 +55,9 @@ class AccountingReport(models.AbstractModel):
     }
 
     total_line = True  # add a grand total line at the end of the report
+    # execute the report's query only once per transaction into a temporary table that is then read by every
+    # hierarchy level, unfolded line and load more page instead of the query itself
+    materialize_table_query = False
 
     # Common account.move.line fields
     move_id = fields.Many2one('account.move')
@@ -81,7 +85,25 @@ class AccountingReport(models.AbstractModel):
     @property
     def _table_query(self):
         query = self._get_sql()
-        return ''.join(query) if isinstance(query, tuple) else query
+        query = ''.join(query) if isinstance(query, tuple) else query
+        if self.materialize_table_query:
+            return self._get_materialized_table_query(query)
+        return query
+
+    def _get_materialized_table_query(self, query):
+        """Materialize the query into a temporary table dropped at the end of the transaction.
+
+        The table name is derived from the query itself, so that it is keyed on the report options
+        embedded in it: a new table is computed as soon as the options change.
+        :param query (str): the fully rendered SQL query of the report.
+        :return (str): a query reading the materialized rows.
+        """
+        table_name = 'account_report_%s' % hashlib.md5(query.encode()).hexdigest()
+        self.env.cr.execute("SELECT to_regclass(%s)", ['pg_temp.%s' % table_name])
+        if not self.env.cr.fetchone()[0]:
+            self.env.cr.execute('CREATE TEMPORARY TABLE %s ON COMMIT DROP AS (%s)' % (table_name, query))
+            self.env.cr.execute('ANALYZE %s' % table_name)
+        return 'SELECT * FROM %s' % table_name
 
     # To override
     def _get_sql(self):
@@ -18,6 +18,7 @@ class ReportAccountAgedPartner(models.AbstractModel):
     filter_unfold_all = False
     filter_partner = True
     order_selected_column = {'default': 0}
+    materialize_table_query = True
 
     partner_id = fields.Many2one('res.partner')
     partner_name = fields.Char(group_operator='max')
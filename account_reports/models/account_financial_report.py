@@ -1279,11 +1279,7 @@ class AccountFinancialReportLine(models.Model):
         queries = []
 
         AccountFinancialReportHtml = self.financial_report_id
-        groupby_list = AccountFinancialReportHtml._get_options_groupby_fields(options_list[0])
-        all_groupby_list = groupby_list.copy()
-        groupby_in_formula = any(x in (self.formulas or '') for x in ('sum_if_pos_groupby', 'sum_if_neg_groupby'))
-        if groupby_in_formula and self.groupby and self.groupby not in all_groupby_list:
-            all_groupby_list.append(self.groupby)
+        groupby_list, all_groupby_list = self._get_sum_groupby_list(options_list)
         groupby_clause = ','.join('account_move_line.%s' % gb for gb in all_groupby_list)
 
         ct_query = self.env['res.currency']._get_query_currency_table(options_list[0])
@@ -1312,6 +1308,130 @@ class AccountFinancialReportLine(models.Model):
 
         # Fetch the results.
 
+        self._cr.execute(' UNION ALL '.join(queries), params)
+        return self._build_sum_results(self._cr.dictfetchall(), groupby_list)
+
+    def _compute_sum_batch(self, options_list, calling_financial_report):
+        ''' Batched version of '_compute_sum' computing the values of all the leaves passed as recordset at once.
+
+        Instead of running one query per line, the lines sharing the same tables, options and group by are resolved
+        together with a single scan of the journal items per period. Each journal item is tagged with the ids of the
+        lines whose domain it matches through a lateral join, then the balances are grouped by line id.
+
+        :param options_list:                The report options list, first one being the current dates range, others
+                                            being the comparisons.
+        :param calling_financial_report:    The financial report called by the user to be rendered.
+        :return:                            A dictionary mapping each line id to its '_compute_sum' results.
+        '''
+        AccountMoveLine = self.env['account.move.line']
+        ct_query = self.env['res.currency']._get_query_currency_table(options_list[0])
+
+        # Group the lines sharing the same query skeleton:
+        # {
+        #     (tables, common_where, common_params, all_groupby_list, counted_field): {
+        #         period_index: [(line_id, line_where, line_params), ...],
+        #     },
+        # }
+        batches = {}
+        for line in self:
+            AccountFinancialReportHtml = line.financial_report_id
+            all_groupby_list = line._get_sum_groupby_list(options_list)[1]
+            parent_financial_report = line._get_financial_report()
+
+            for i, options in enumerate(options_list):
+                new_options = line._get_options_financial_line(options, calling_financial_report, parent_financial_report)
+                line_domain = line._get_domain(new_options, parent_financial_report)
+
+                # The tables must take the joins of the line domain into account but the line specific conditions are
+                # kept apart to be evaluated inside the lateral join.
+                tables, _where_clause, _where_params = AccountFinancialReportHtml._query_get(new_options, domain=line_domain)
+                _tables, common_where, common_params = AccountFinancialReportHtml._query_get(new_options)
+                _tables, line_where, line_params = AccountMoveLine._where_calc(line_domain).get_sql()
+
+                batch_key = (tables, common_where, tuple(common_params), tuple(all_groupby_list), line.groupby or 'id')
+                batches.setdefault(batch_key, {}).setdefault(i, [])
+                batches[batch_key][i].append((line.id, line_where or 'TRUE', line_params))
+
+        # Fetch the results.
+
+        rows_by_line_id = {line.id: [] for line in self}
+        for batch_key, lines_by_period in batches.items():
+            tables, common_where, common_params, all_groupby_list, counted_field = batch_key
+            groupby_clause = ','.join('account_move_line.%s' % gb for gb in all_groupby_list)
+
+            params = []
+            queries = []
+            for i, line_filters in lines_by_period.items():
+                lateral_queries = []
+                lateral_params = []
+                for line_id, line_where, line_params in line_filters:
+                    lateral_queries.append('SELECT %s AS id WHERE ' + line_where)
+                    lateral_params += [line_id] + line_params
+
+                queries.append('''
+                    SELECT
+                        financial_line.id AS financial_line_id,
+                        ''' + (groupby_clause and '%s,' % groupby_clause) + ''' %s AS period_index,
+                        COUNT(DISTINCT account_move_line.''' + counted_field + ''') AS count_rows,
+                        COALESCE(SUM(ROUND(account_move_line.balance * currency_table.rate, currency_table.precision)), 0.0) AS balance
+                    FROM ''' + tables + '''
+                    JOIN ''' + ct_query + ''' ON currency_table.company_id = account_move_line.company_id
+                    CROSS JOIN LATERAL (''' + ' UNION ALL '.join(lateral_queries) + ''') AS financial_line
+                    WHERE ''' + common_where + '''
+                    GROUP BY financial_line.id''' + (groupby_clause and ', %s' % groupby_clause) + '''
+                ''')
+                params.append(i)
+                params += lateral_params
+                params += list(common_params)
+
+            self._cr.execute(' UNION ALL '.join(queries), params)
+            fetched_keys = set()
+            for res in self._cr.dictfetchall():
+                rows_by_line_id[res['financial_line_id']].append(res)
+                fetched_keys.add((res['financial_line_id'], res['period_index']))
+
+            # Without any group by, the aggregate always yields a row by period, even without any journal item.
+            # The GROUP BY on the financial line drops them so they are added back with zero values.
+            if not all_groupby_list:
+                for i, line_filters in lines_by_period.items():
+                    for line_id, _line_where, _line_params in line_filters:
+                        if (line_id, i) not in fetched_keys:
+                            rows_by_line_id[line_id].append({
+                                'financial_line_id': line_id,
+                                'period_index': i,
+                                'count_rows': 0,
+                                'balance': 0.0,
+                            })
+
+        results = {}
+        for line in self:
+            groupby_list = line._get_sum_groupby_list(options_list)[0]
+            results[line.id] = self._build_sum_results(rows_by_line_id[line.id], groupby_list)
+        return results
+
+    def _get_sum_groupby_list(self, options_list):
+        ''' Get the group by fields involved when computing the 'sum' of the current line.
+        :param options_list:    The report options list, first one being the current dates range, others
+                                being the comparisons.
+        :return:                A tuple (groupby_list, all_groupby_list) where 'groupby_list' contains the fields used
+                                to build the keys and 'all_groupby_list' the fields used in the GROUP BY clause.
+        '''
+        self.ensure_one()
+        groupby_list = self.financial_report_id._get_options_groupby_fields(options_list[0])
+        all_groupby_list = groupby_list.copy()
+        groupby_in_formula = any(x in (self.formulas or '') for x in ('sum_if_pos_groupby', 'sum_if_neg_groupby'))
+        if groupby_in_formula and self.groupby and self.groupby not in all_groupby_list:
+            all_groupby_list.append(self.groupby)
+        return groupby_list, all_groupby_list
+
+    @api.model
+    def _build_sum_results(self, rows, groupby_list):
+        ''' Build the '_compute_sum' results from the fetched rows.
+        :param rows:            The fetched rows, each one having a 'period_index', 'count_rows' and 'balance' key
+                                plus the group by fields.
+        :param groupby_list:    The group by fields used to build the keys.
+        :return:                See '_compute_sum'.
+        '''
         results = {
             'sum': {},
             'sum_if_pos': {},
@@ -1321,8 +1441,7 @@ class AccountFinancialReportLine(models.Model):
             'count_rows': {},
         }
 
-        self._cr.execute(' UNION ALL '.join(queries), params)
-        for res in self._cr.dictfetchall():
+        for res in rows:
             # Build the key.
             key = [res['period_index']]
             for gb in groupby_list:
@@ -177,6 +177,97 @@ class AccountGeneralLedgerReport(models.AbstractModel):
             return aml_lines
         return lines
 
+    @api.model
+    def _get_xlsx_table(self, options):
+        # OVERRIDE to yield the lines one by one instead of building the whole report in memory.
+        return self.get_header(options), self._get_general_ledger_lines_iter(options)
+
+    @api.model
+    def _get_general_ledger_lines_iter(self, options):
+        ''' Get lines for the whole report, like '_get_general_ledger_lines' but as a generator: the journal items are
+        fetched account by account through a server-side cursor and the lines are yielded as soon as they are built.
+        As it is meant for exports, all the journal items of the unfolded accounts are returned (no load more).
+        :param options: The report options.
+        :return:        An iterator of lines, each one represented by a dictionary.
+        '''
+        options_list = self._get_options_periods_list(options)
+        unfold_all = options.get('unfold_all') or (self._context.get('print_mode') and not options['unfolded_lines'])
+        date_from = fields.Date.from_string(options['date']['date_from'])
+        company_currency = self.env.company.currency_id
+
+        accounts_results, taxes_results = self._do_query(options_list, fetch_lines=False)
+
+        total_debit = total_credit = total_balance = 0.0
+        for account, periods_results in accounts_results:
+            # No comparison allowed in the General Ledger. Then, take only the first period.
+            results = periods_results[0]
+
+            is_unfolded = 'account_%s' % account.id in options['unfolded_lines']
+
+            # account.account record line.
+            account_sum = results.get('sum', {})
+            account_un_earn = results.get('unaffected_earnings', {})
+
+            # Check if there is sub-lines for the current period.
+            max_date = account_sum.get('max_date')
+            has_lines = max_date and max_date >= date_from or False
+
+            amount_currency = account_sum.get('amount_currency', 0.0) + account_un_earn.get('amount_currency', 0.0)
+            debit = account_sum.get('debit', 0.0) + account_un_earn.get('debit', 0.0)
+            credit = account_sum.get('credit', 0.0) + account_un_earn.get('credit', 0.0)
+            balance = account_sum.get('balance', 0.0) + account_un_earn.get('balance', 0.0)
+
+            yield self._get_account_title_line(options, account, amount_currency, debit, credit, balance, has_lines)
+
+            total_debit += debit
+            total_credit += credit
+            total_balance += balance
+
+            if has_lines and (unfold_all or is_unfolded):
+                # Initial balance line.
+                account_init_bal = results.get('initial_balance', {})
+
+                cumulated_balance = account_init_bal.get('balance', 0.0) + account_un_earn.get('balance', 0.0)
+
+                yield self._get_initial_balance_line(
+                    options, account,
+                    account_init_bal.get('amount_currency', 0.0) + account_un_earn.get('amount_currency', 0.0),
+                    account_init_bal.get('debit', 0.0) + account_un_earn.get('debit', 0.0),
+                    account_init_bal.get('credit', 0.0) + account_un_earn.get('credit', 0.0),
+                    cumulated_balance,
+                )
+
+                # account.move.line record lines.
+                amls_query, amls_params = self._get_query_amls(options, account)
+                for aml in self._fetch_rows_by_chunk(amls_query, amls_params):
+                    cumulated_balance += aml['balance']
+                    yield self._get_aml_line(options, account, aml, company_currency.round(cumulated_balance))
+
+                if self.env.company.totals_below_sections:
+                    # Account total line.
+                    yield self._get_account_total_line(
+                        options, account,
+                        account_sum.get('amount_currency', 0.0),
+                        account_sum.get('debit', 0.0),
+                        account_sum.get('credit', 0.0),
+                        account_sum.get('balance', 0.0),
+                    )
+
+        # Report total line.
+        yield self._get_total_line(
+            options,
+            total_debit,
+            total_credit,
+            company_currency.round(total_balance),
+        )
+
+        # Tax Declaration lines.
+        journal_options = self._get_options_journals(options)
+        if len(journal_options) == 1 and journal_options[0]['type'] in ('sale', 'purchase'):
+            yield from self._get_tax_declaration_lines(
+                options, journal_options[0]['type'], taxes_results
+            )
+
     @api.model
     def _load_more_lines(self, options, line_id, offset, load_more_remaining, balance_progress):
         ''' Get lines for an expanded line using the load more.
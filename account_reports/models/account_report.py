@@ -3,10 +3,10 @@
 import ast
 import copy
 import datetime
-import io
 import json
 import logging
 import markupsafe
+import tempfile
 from collections import defaultdict
 from math import copysign, inf
 
@@ -879,6 +879,25 @@ class AccountReport(models.AbstractModel):
 
         return query.get_sql()
 
+    @api.model
+    def _fetch_rows_by_chunk(self, query, params, chunk_size=1000):
+        """ Execute the query through a server-side cursor and yield its rows as dictionaries, fetched chunk by chunk
+        so that the whole result is never loaded in memory at once.
+        :param query:       The query to execute.
+        :param params:      The parameters of the query.
+        :param chunk_size:  The number of rows to fetch at once.
+        """
+        self._cr.execute('DECLARE account_report_rows NO SCROLL CURSOR FOR ' + query, params)
+        try:
+            while True:
+                self._cr.execute('FETCH %s FROM account_report_rows', [chunk_size])
+                rows = self._cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            self._cr.execute('CLOSE account_report_rows')
+
     ####################################################
     # LINE IDS MANAGEMENT HELPERS
     ####################################################
@@ -974,6 +993,15 @@ class AccountReport(models.AbstractModel):
     def _get_table(self, options):
         return self.get_header(options), self._get_lines(options)
 
+    #TO BE OVERWRITTEN
+    def _get_xlsx_table(self, options):
+        """ Get the headers and the lines to export in xlsx. Reports able to compute their lines incrementally should
+        return an iterator of lines to keep the memory used by the export constant.
+        :param options: The report options.
+        :return:        (headers, lines) where lines is an iterable of lines, each one represented by a dictionary.
+        """
+        return self._get_table(options)
+
     #TO BE OVERWRITTEN
     def _get_templates(self):
         return {
@@ -1658,9 +1686,19 @@ class AccountReport(models.AbstractModel):
                 }
 
     def get_xlsx(self, options, response=None):
-        output = io.BytesIO()
+        with self.get_xlsx_file(options) as output:
+            return output.read()
+
+    def get_xlsx_file(self, options):
+        """ Export the report to a temporary xlsx file. The workbook is written in 'constant_memory' mode, flushing each
+        row to disk as soon as the next one starts, so that the memory used doesn't depend on the report size as long
+        as '_get_xlsx_table' yields the lines incrementally.
+        :param options: The report options.
+        :return:        A temporary file object positioned at its beginning, deleted once closed.
+        """
+        output = tempfile.TemporaryFile()
         workbook = xlsxwriter.Workbook(output, {
-            'in_memory': True,
+            'constant_memory': True,
             'strings_to_formulas': False,
         })
         sheet = workbook.add_worksheet(self._get_report_name()[:31])
@@ -1683,7 +1721,7 @@ class AccountReport(models.AbstractModel):
         sheet.set_column(0, 0, 50)
 
         y_offset = 0
-        headers, lines = self.with_context(no_format=True, print_mode=True, prefetch_fields=False)._get_table(options)
+        headers, lines = self.with_context(no_format=True, print_mode=True, prefetch_fields=False)._get_xlsx_table(options)
 
         # Add headers.
         for header in headers:
@@ -1698,15 +1736,16 @@ class AccountReport(models.AbstractModel):
                 x_offset += colspan
             y_offset += 1
 
+        # The hierarchy and the sorting need the whole list of lines.
         if options.get('hierarchy'):
-            lines = self._create_hierarchy(lines, options)
+            lines = self._create_hierarchy(list(lines), options)
         if options.get('selected_column'):
-            lines = self._sort_lines(lines, options)
+            lines = self._sort_lines(list(lines), options)
 
         # Add lines.
-        for y in range(0, len(lines)):
-            level = lines[y].get('level')
-            if lines[y].get('caret_options'):
+        for y, line in enumerate(lines):
+            level = line.get('level')
+            if line.get('caret_options'):
                 style = level_3_style
                 col1_style = level_3_col1_style
             elif level == 0:
@@ -1718,35 +1757,33 @@ class AccountReport(models.AbstractModel):
                 col1_style = style
             elif level == 2:
                 style = level_2_style
-                col1_style = 'total' in lines[y].get('class', '').split(' ') and level_2_col1_total_style or level_2_col1_style
+                col1_style = 'total' in line.get('class', '').split(' ') and level_2_col1_total_style or level_2_col1_style
             elif level == 3:
                 style = level_3_style
-                col1_style = 'total' in lines[y].get('class', '').split(' ') and level_3_col1_total_style or level_3_col1_style
+                col1_style = 'total' in line.get('class', '').split(' ') and level_3_col1_total_style or level_3_col1_style
             else:
                 style = default_style
                 col1_style = default_col1_style
 
             #write the first column, with a specific style to manage the indentation
-            cell_type, cell_value = self._get_cell_type_value(lines[y])
+            cell_type, cell_value = self._get_cell_type_value(line)
             if cell_type == 'date':
                 sheet.write_datetime(y + y_offset, 0, cell_value, date_default_col1_style)
             else:
                 sheet.write(y + y_offset, 0, cell_value, col1_style)
 
             #write all the remaining cells
-            for x in range(1, len(lines[y]['columns']) + 1):
-                cell_type, cell_value = self._get_cell_type_value(lines[y]['columns'][x - 1])
+            for x in range(1, len(line['columns']) + 1):
+                cell_type, cell_value = self._get_cell_type_value(line['columns'][x - 1])
                 if cell_type == 'date':
-                    sheet.write_datetime(y + y_offset, x + lines[y].get('colspan', 1) - 1, cell_value, date_default_style)
+                    sheet.write_datetime(y + y_offset, x + line.get('colspan', 1) - 1, cell_value, date_default_style)
                 else:
-                    sheet.write(y + y_offset, x + lines[y].get('colspan', 1) - 1, cell_value, style)
+                    sheet.write(y + y_offset, x + line.get('colspan', 1) - 1, cell_value, style)
 
         workbook.close()
         output.seek(0)
-        generated_file = output.read()
-        output.close()
 
-        return generated_file
+        return output
 
     def _get_cell_type_value(self, cell):
         if 'date' not in cell.get('class', '') or not cell.get('name'):
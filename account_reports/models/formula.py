@@ -8,9 +8,9 @@ import re
 import ast
 
 
-PROTECTED_KEYWORDS = (
-    'sum', 'sum_if_pos', 'sum_if_neg',
-    'sum_if_pos_groupby', 'sum_if_neg_groupby',
+SUM_KEYWORDS = ('sum', 'sum_if_pos', 'sum_if_neg', 'sum_if_pos_groupby', 'sum_if_neg_groupby')
+
+PROTECTED_KEYWORDS = SUM_KEYWORDS + (
     'debit', 'credit', 'balance',
     'count_rows', 'from_context', 'NDays',
     '__builtins__'
@@ -35,7 +35,7 @@ class FormulaLocals(dict):
             return self.solver._get_balance_from_context(self.financial_line)
         elif item == 'count_rows':
             return self.solver._get_amls_results(self.financial_line)[item].get(self.key[0], 0)
-        elif item in ('sum', 'sum_if_pos', 'sum_if_neg', 'sum_if_pos_groupby', 'sum_if_neg_groupby'):
+        elif item in SUM_KEYWORDS:
             return self.solver._get_amls_results(self.financial_line)[item].get(self.key, 0.0)
         else:
             financial_line = self.solver._get_line_by_code(item)
@@ -45,7 +45,7 @@ class FormulaLocals(dict):
 
 
 class FormulaSolver:
-    def __init__(self, options_list, financial_report):
+    def __init__(self, options_list, financial_report, batch_mode=True):
         self.options_list = options_list
         self.financial_report = financial_report
         self.env = financial_report.env
@@ -87,6 +87,14 @@ class FormulaSolver:
         # contains (0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (1, 4).
         self.encountered_keys = set()
 
+        # When enabled, 'fetch_lines' resolves all the leaves involved in the evaluation with a few grouped queries
+        # instead of one query per leaf.
+        self.batch_mode = batch_mode
+
+        # A mapping of financial.report.line's id => '_compute_sum' results computed in batch by 'fetch_lines' but not
+        # yet consumed by '_get_amls_results'.
+        self.cache_batch_amls_by_id = {}
+
     # -------------------------------------------------------------------------
     # PRIVATE METHODS
     # -------------------------------------------------------------------------
@@ -156,7 +164,10 @@ class FormulaSolver:
             # If this line is visited for the first time, trigger the computation of '_compute_sum' and
             # cache the results.
 
-            results = financial_line._compute_sum(self.options_list, self.financial_report)
+            if financial_line.id in self.cache_batch_amls_by_id:
+                results = self.cache_batch_amls_by_id.pop(financial_line.id)
+            else:
+                results = financial_line._compute_sum(self.options_list, self.financial_report)
             for key in results['sum']:
                 self.encountered_keys.add(key)
 
@@ -204,7 +215,7 @@ class FormulaSolver:
                 self.financial_line = financial_line
 
             def visit_Name(self, node):
-                if node.id in ('sum', 'sum_if_pos', 'sum_if_neg', 'sum_if_pos_groupby', 'sum_if_neg_groupby'):
+                if node.id in SUM_KEYWORDS:
                     # The current line contains a 'sum' and then, must be evaluate directly.
                     self.solver._get_amls_results(self.financial_line)
                 else:
@@ -223,6 +234,48 @@ class FormulaSolver:
 
         LeafResolver(self, financial_line).visit(ast.parse(financial_line.formulas))
 
+    def _get_formula_names(self, financial_line):
+        ''' Helper to get all the names involved in the formula of a financial report line, i.e. the keywords and
+        the codes of the other lines.
+        :param financial_line:  A record of the account.financial.html.report.line model.
+        :return:                A set of names.
+        '''
+        if not financial_line.formulas:
+            return set()
+        return {node.id for node in ast.walk(ast.parse(financial_line.formulas)) if isinstance(node, ast.Name)}
+
+    def _prefetch_leaves(self, financial_lines):
+        ''' Compute in batch the 'amls' results of all the leaves involved by the lines passed as parameter, either
+        as children or through the codes used in the formulas. The results are consumed lazily by '_get_amls_results'
+        so the evaluation itself remains unchanged.
+        :param financial_lines: An account.financial.html.report.line recordset.
+        '''
+        FinancialLine = self.env['account.financial.html.report.line']
+        leaves = FinancialLine
+        visited_lines = FinancialLine
+        visited_codes = set(self.cache_line_by_code)
+        to_visit = financial_lines
+        while to_visit:
+            visited_lines |= to_visit
+            codes = set()
+            for financial_line in to_visit:
+                if financial_line.code:
+                    visited_codes.add(financial_line.code)
+                names = self._get_formula_names(financial_line)
+                if names.intersection(SUM_KEYWORDS) and 'amls' not in self.cache_results_by_id.get(financial_line.id, {}):
+                    leaves |= financial_line
+                codes |= names - set(PROTECTED_KEYWORDS)
+
+            to_visit = to_visit.children_ids
+            codes -= visited_codes
+            if codes:
+                to_visit |= FinancialLine.search([('code', 'in', list(codes))])
+            to_visit -= visited_lines
+
+        leaves -= FinancialLine.browse(list(self.cache_batch_amls_by_id))
+        if leaves:
+            self.cache_batch_amls_by_id.update(leaves._compute_sum_batch(self.options_list, self.financial_report))
+
     def _get_number_of_days(self, period_index):
         ''' Helper to compute the NDays value that could be used inside formulas. This key returns the number of days
         inside the current period.
@@ -264,14 +317,18 @@ class FormulaSolver:
     def fetch_lines(self, financial_lines):
         ''' Prefetch lines passed as parameter.
         The lines involved through a formula will also be prefetched.
+        In batch mode, all the leaves of the hierarchy are first resolved together.
         :param financial_lines: An account.financial.html.report.line recordset.
         '''
-        children_financial_lines = self.env['account.financial.html.report.line']
-        for financial_line in financial_lines:
-            self._prefetch_line(financial_line)
-            children_financial_lines += financial_line.children_ids
-        if children_financial_lines:
-            self.fetch_lines(children_financial_lines)
+        if self.batch_mode:
+            self._prefetch_leaves(financial_lines)
+
+        while financial_lines:
+            children_financial_lines = self.env['account.financial.html.report.line']
+            for financial_line in financial_lines:
+                self._prefetch_line(financial_line)
+                children_financial_lines += financial_line.children_ids
+            financial_lines = children_financial_lines
 
     def get_keys(self):
         ''' Get all involved keys found in the solver. '''
@@ -317,7 +374,7 @@ class FormulaSolver:
             formula = inject_in_formula(formula, 'count_rows', results['amls']['count_rows'].get(0, 0))
 
             # Manage 'sum', 'sum_if_pos', 'sum_if_neg'.
-            for keyword in ('sum', 'sum_if_pos', 'sum_if_neg', 'sum_if_pos_groupby', 'sum_if_neg_groupby'):
+            for keyword in SUM_KEYWORDS:
                 balance = sum(results['amls'][keyword].values())
                 formula = inject_in_formula(formula, keyword, balance, is_monetary=True)
 
@@ -6,6 +6,14 @@ class StandardReportXlsx(models.AbstractModel):
     _inherit = 'report.report_xlsx.abstract'
     _description = 'Standard Report Excel'
 
+    def create_xlsx_report(self, docids, data):
+        wizard = self._get_objs_for_report(docids, data)
+        if len(wizard) != 1 or not wizard.excel_temp_tables:
+            return super(StandardReportXlsx, self).create_xlsx_report(docids, data)
+        with wizard._compute_data_in_temp_table() as wizard:
+            report = self.with_context(standard_ledger_line_table=wizard._get_line_table())
+            return super(StandardReportXlsx, report).create_xlsx_report(docids, data)
+
     def generate_xlsx_report(self, workbook, data, wizard):
         num_format = wizard.company_currency_id.excel_format
         bold = workbook.add_format({'bold': True})
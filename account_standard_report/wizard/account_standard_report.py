@@ -1,6 +1,7 @@
 import calendar
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from odoo import api, models, fields, _
+from odoo import api, models, fields, tools, _
 from odoo.exceptions import  UserError
 from odoo.tools import format_datetime
 
@@ -108,6 +109,10 @@ class AccountStandardLedgerLines(models.TransientModel):
 
     company_currency_id = fields.Many2one('res.currency')
 
+    def init(self):
+        tools.create_index(self._cr, 'account_report_standard_ledger_line_report_object_type_index',
+                           self._table, ['report_id', 'report_object_id', 'line_type'])
+
     @api.model
     def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
         res = super(AccountStandardLedgerLines, self).read_group(
@@ -230,6 +235,10 @@ class AccountStandardLedger(models.TransientModel):
                                     ('analytic', 'Analytic')], string='Report Type')
     template_id = fields.Many2one('account.report.template', 'Template')
     analytic_account_ids = fields.Many2many('account.analytic.account', relation='rel_ledger_analytic_account')
+    excel_temp_tables = fields.Boolean(
+        'Excel Without Stored Lines', default=False,
+        help=' * Check : the lines of the Excel file are computed in a temporary table dropped once the file is generated.\n'
+        ' * Uncheck : the lines are stored in the database like for the other outputs.\n')
 
     @api.onchange('ledger_type')
     def _onchange_ledger_type(self):
@@ -286,9 +295,33 @@ class AccountStandardLedger(models.TransientModel):
 
     def print_excel_report(self):
         self.ensure_one()
-        self._compute_data()
+        if not self.excel_temp_tables:
+            # with temporary tables, the data are computed when generating the file
+            self._compute_data()
         return self.env.ref('account_standard_report.action_standard_excel').report_action(self)
 
+    def _get_line_table(self):
+        return self.env.context.get('standard_ledger_line_table') or self.env['account.report.standard.ledger.line']._table
+
+    @contextmanager
+    def _compute_data_in_temp_table(self):
+        """ Compute the lines in a session temporary table instead of the transient model table, so they are neither
+        WAL logged nor kept until the transient vacuum. The table is dropped when leaving the context.
+        Yield the wizard with the context giving access to the lines through '_sql_get_line_for_report'.
+        """
+        self.ensure_one()
+        line_table = 'standard_ledger_line_%s' % self.id
+        self.env.cr.execute("""
+            CREATE TEMPORARY TABLE {line_table} (LIKE {model_table} INCLUDING DEFAULTS) ON COMMIT DROP;
+            CREATE INDEX ON {line_table} (report_id, report_object_id, line_type);
+        """.format(line_table=line_table, model_table=self.env['account.report.standard.ledger.line']._table))
+        try:
+            wizard = self.with_context(standard_ledger_line_table=line_table)
+            wizard._compute_data()
+            yield wizard
+        finally:
+            self.env.cr.execute('DROP TABLE IF EXISTS %s' % line_table)
+
     def _pre_compute(self):
         self.account_ids = self._search_account()
 
@@ -338,6 +371,10 @@ class AccountStandardLedger(models.TransientModel):
         self._sql_super_total()
         self.refresh()
 
+        if self.env.context.get('standard_ledger_line_table'):
+            # lines in a temporary table are only read in SQL
+            return
+
         # complet total line
         line_obj = self.env['account.report.standard.ledger.line']
         self.report_id.line_total_ids = line_obj.search(
@@ -415,7 +452,7 @@ class AccountStandardLedger(models.TransientModel):
                                                                      'name': '%s %s' % (unaffected_earnings_account.code, unaffected_earnings_account.name),
                                                                      'account_id': unaffected_earnings_account.id})
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, account_id, line_type, view_type, date, debit, credit, balance, cumul_balance, company_currency_id, reconciled, report_object_id)
         SELECT
             %(report_id)s AS report_id,
@@ -444,7 +481,7 @@ class AccountStandardLedger(models.TransientModel):
             AND aml.date < %(date_from)s
             AND acc_type.include_initial_balance IS NOT TRUE
 
-        """
+        """.format(line_table=self._get_line_table())
         #     HAVING
         # CASE
         #     WHEN %(init_balance_history)s = FALSE THEN ABS(SUM(aml.balance)) > %(rounding)s
@@ -472,7 +509,7 @@ class AccountStandardLedger(models.TransientModel):
     def _sql_init_balance(self):
         # initial balance partner
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, account_id, partner_id, group_by_key, line_type, view_type, date, debit, credit, balance, cumul_balance, company_currency_id, reconciled, report_object_id)
 
         WITH matching_in_futur_before_init (id) AS
@@ -531,7 +568,7 @@ class AccountStandardLedger(models.TransientModel):
                 WHEN %(init_balance_history)s IS FALSE THEN ABS(SUM(aml.balance)) > %(rounding)s
                 ELSE ABS(SUM(aml.debit)) > %(rounding)s OR ABS(SUM(aml.debit)) > %(rounding)s OR ABS(SUM(aml.balance)) > %(rounding)s
             END
-        """
+        """.format(line_table=self._get_line_table())
         rounding = self.company_currency_id.rounding / 2
         params = {
             'company_id': self.company_id.id,
@@ -555,7 +592,7 @@ class AccountStandardLedger(models.TransientModel):
     def _sql_lines(self):
         # lines_table
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, account_id, analytic_account_id, line_type, view_type, journal_id, partner_id, move_id, move_line_id, date, date_maturity, debit, credit, balance, full_reconcile_id, reconciled, report_object_id, cumul_balance, current, age_30_days, age_60_days, age_90_days, age_120_days, older, company_currency_id, amount_currency, currency_id)
 
         WITH matching_in_futur_before_init (id) AS
@@ -588,7 +625,7 @@ class AccountStandardLedger(models.TransientModel):
                 MIN(report_object_id) AS id,
                 COALESCE(SUM(balance), 0) AS balance
             FROM
-                account_report_standard_ledger_line
+                {line_table}
             WHERE
                 report_id = %(report_id)s
                 AND line_type = '0_init'
@@ -678,7 +715,7 @@ class AccountStandardLedger(models.TransientModel):
             AND ABS(aml.balance) > %(rounding)s
         ORDER BY
             aml.date, aml.id
-        """
+        """.format(line_table=self._get_line_table())
         
         rounding = self.company_currency_id.rounding / 2
         params = {
@@ -707,7 +744,7 @@ class AccountStandardLedger(models.TransientModel):
 
     def _sql_lines_compacted(self):
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, account_id, line_type, view_type, date, debit, credit, balance, cumul_balance, company_currency_id, report_object_id)
 
         WITH initial_balance (id, balance) AS
@@ -716,7 +753,7 @@ class AccountStandardLedger(models.TransientModel):
             MIN(report_object_id) AS id,
             COALESCE(SUM(balance), 0) AS balance
         FROM
-            account_report_standard_ledger_line
+            {line_table}
         WHERE
             report_id = %(report_id)s
             AND line_type = '0_init'
@@ -758,7 +795,7 @@ class AccountStandardLedger(models.TransientModel):
             AND (%(compact_account)s AND acc.compacted IS TRUE)
         GROUP BY
             aml.account_id
-        """
+        """.format(line_table=self._get_line_table())
 
         params = {
             'company_id': self.company_id.id,
@@ -777,7 +814,7 @@ class AccountStandardLedger(models.TransientModel):
 
     def _sql_total(self):
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, account_id, partner_id, journal_id, analytic_account_id, line_type, view_type, date, debit, credit, balance, cumul_balance, report_object_id, current, age_30_days, age_60_days, age_90_days, age_120_days, older, company_currency_id)
         SELECT
             %(report_id)s AS report_id,
@@ -803,7 +840,7 @@ class AccountStandardLedger(models.TransientModel):
             COALESCE(SUM(older), 0) AS older,
             %(company_currency_id)s AS company_currency_id
         FROM
-            account_report_standard_ledger_line
+            {line_table}
         WHERE
             report_id = %(report_id)s
             AND report_object_id IS NOT NULL
@@ -811,7 +848,7 @@ class AccountStandardLedger(models.TransientModel):
             report_object_id
         ORDER BY
             report_object_id
-        """
+        """.format(line_table=self._get_line_table())
 
         params = {
             'date_from': self.report_id.date_from,
@@ -824,7 +861,7 @@ class AccountStandardLedger(models.TransientModel):
 
     def _sql_super_total(self):
         query = """
-        INSERT INTO account_report_standard_ledger_line
+        INSERT INTO {line_table}
             (report_id, create_uid, create_date, line_type, view_type, date, debit, credit, balance, cumul_balance, current, age_30_days, age_60_days, age_90_days, age_120_days, older, company_currency_id)
         SELECT
             %(report_id)s AS report_id,
@@ -845,11 +882,11 @@ class AccountStandardLedger(models.TransientModel):
             COALESCE(SUM(older), 0) AS older,
             %(company_currency_id)s AS company_currency_id
         FROM
-            account_report_standard_ledger_line
+            {line_table}
         WHERE
             report_id = %(report_id)s
             AND line_type = '4_total'
-        """
+        """.format(line_table=self._get_line_table())
         params = {
             'date_from': self.report_id.date_from,
             'report_id': self.report_id.id,
@@ -931,7 +968,7 @@ class AccountStandardLedger(models.TransientModel):
                 ELSE ''
             END AS matching_number
         FROM
-            account_report_standard_ledger_line raml
+            {line_table} raml
             LEFT JOIN account_account acc ON (acc.id = raml.account_id)
             LEFT JOIN account_journal acj ON (acj.id = raml.journal_id)
             LEFT JOIN res_partner rep ON (rep.id = raml.partner_id)
@@ -945,7 +982,7 @@ class AccountStandardLedger(models.TransientModel):
             AND (%(with_object)s OR raml.report_object_id = %(report_object)s)
             AND raml.line_type IN %(type_l)s
         ORDER BY
-            raml.id"""
+            raml.id""".format(line_table=self._get_line_table())
         params = {
             'report_id': self.report_id.id,
             'report_type': self.report_type,
@@ -39,45 +39,75 @@ class ReportFinancial(models.AbstractModel):
                 res[row['id']] = row
         return res
 
-    def _compute_report_balance(self, reports):
+    def _get_report_accounts(self, reports, accounts_by_report=None):
+        """ collect the accounts directly linked to each financial report of
+            the tree starting at the provided reports (linked reports and
+            children included)
+        """
+        if accounts_by_report is None:
+            accounts_by_report = {}
+        for report in reports:
+            if report.id in accounts_by_report:
+                continue
+            accounts_by_report[report.id] = self.env['account.account']
+            if report.type == 'accounts':
+                accounts_by_report[report.id] = report.account_ids
+            elif report.type == 'account_type':
+                accounts_by_report[report.id] = self.env['account.account'].search(
+                    [('user_type_id', 'in', report.account_type_ids.ids)])
+            elif report.type == 'account_report' and report.account_report_id:
+                self._get_report_accounts(report.account_report_id, accounts_by_report)
+            elif report.type == 'sum':
+                self._get_report_accounts(report.children_ids, accounts_by_report)
+        return accounts_by_report
+
+    def _compute_report_balance(self, reports, accounts_by_report=None, account_balances=None, memo=None):
         '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)
+           The balances of all the accounts involved in the tree are fetched
+           with a single query, then each record is computed only once.'''
+        if account_balances is None:
+            accounts_by_report = self._get_report_accounts(reports)
+            accounts = self.env['account.account'].union(*accounts_by_report.values())
+            account_balances = self._compute_account_balance(accounts)
+            memo = {}
         res = {}
         fields = ['credit', 'debit', 'balance']
         for report in reports:
             if report.id in res:
                 continue
+            if report.id in memo:
+                res[report.id] = memo[report.id]
+                continue
             res[report.id] = dict((fn, 0.0) for fn in fields)
-            if report.type == 'accounts':
-                # it's the sum of the linked accounts
-                res[report.id]['account'] = self._compute_account_balance(report.account_ids)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
-            elif report.type == 'account_type':
-                # it's the sum the leaf accounts with such an account type
-                accounts = self.env['account.account'].search(
-                    [('user_type_id', 'in', report.account_type_ids.ids)])
-                res[report.id]['account'] = self._compute_account_balance(accounts)
+            if report.type in ('accounts', 'account_type'):
+                # it's the sum of the linked accounts or of the leaf accounts with such an account type
+                res[report.id]['account'] = {
+                    account.id: dict(account_balances[account.id])
+                    for account in accounts_by_report[report.id]
+                }
                 for value in res[report.id]['account'].values():
                     for field in fields:
                         res[report.id][field] += value.get(field)
             elif report.type == 'account_report' and report.account_report_id:
                 # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
+                res2 = self._compute_report_balance(
+                    report.account_report_id, accounts_by_report, account_balances, memo)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
             elif report.type == 'sum':
                 # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
+                res2 = self._compute_report_balance(
+                    report.children_ids, accounts_by_report, account_balances, memo)
                 for key, value in res2.items():
                     for field in fields:
                         res[report.id][field] += value[field]
+            memo[report.id] = res[report.id]
         return res
 
     def get_account_lines(self, data):
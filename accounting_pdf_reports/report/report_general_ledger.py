@@ -4,11 +4,31 @@ import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+FETCH_CHUNK_SIZE = 10000
+
 
 class ReportGeneralLedger(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_general_ledger'
     _description = 'General Ledger Report'
 
+    def _fetch_rows_by_chunk(self, sql, params, chunk_size=FETCH_CHUNK_SIZE):
+        """
+        Execute the query through a server-side cursor and yield its rows
+        chunk by chunk, so that the whole result set is never loaded at
+        once by the client.
+        """
+        cr = self.env.cr
+        cr.execute('DECLARE general_ledger_lines NO SCROLL CURSOR FOR ' + sql, params)
+        try:
+            while True:
+                cr.execute('FETCH %s FROM general_ledger_lines', (chunk_size,))
+                rows = cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cr.execute('CLOSE general_ledger_lines')
+
     def _get_account_move_entry(self, accounts, analytic_account_ids,
                                 partner_ids, init_balance,
                                 sortby, display_account):
@@ -111,14 +131,17 @@ class ReportGeneralLedger(models.AbstractModel):
             l.account_id, l.date, j.code, l.currency_id, l.amount_currency, 
             l.ref, l.name, m.name, c.symbol, p.name, aaa.name ORDER BY ''' + sql_sort)
         params = (tuple(accounts.ids),) + tuple(where_params)
-        cr.execute(sql, params)
 
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+        # Running balance of each account, starting from its initial balance
+        running_balances = {
+            account_id: sum(line['debit'] - line['credit'] for line in lines)
+            for account_id, lines in move_lines.items()
+        }
+        for row in self._fetch_rows_by_chunk(sql, params):
+            account_id = row.pop('account_id')
+            running_balances[account_id] += row['debit'] - row['credit']
+            row['balance'] = running_balances[account_id]
+            move_lines[account_id].append(row)
 
         # Calculate the debit, credit and balance for Accounts
         account_res = []
@@ -5,6 +5,7 @@ import time
 import shutil
 import json
 import tempfile
+import zipfile
 
 from odoo import models, fields, api, tools, _
 from odoo.exceptions import Warning, AccessDenied
@@ -37,6 +38,14 @@ class DbBackup(models.Model):
     folder = fields.Char('Backup Directory', help='Absolute path for storing the backups', required='True',
                          default='/odoo/backups')
     backup_type = fields.Selection([('zip', 'Zip'), ('dump', 'Dump')], 'Backup Type', required=True, default='zip')
+    incremental_filestore = fields.Boolean('Incremental Filestore',
+                                           help='If you check this option the zip backups only contain the filestore '
+                                                'files added since the previous backup. Restoring such a backup needs '
+                                                'the previous backups of its chain, down to the last full backup.')
+    full_backup_interval = fields.Integer('Full backup every x backups',
+                                          help='Number of backups in a chain of incremental backups, the first one '
+                                               'being a full backup.',
+                                          default=7)
     autoremove = fields.Boolean('Auto. Remove Backups',
                                 help='If you check this option you can choose to automaticly remove the backup '
                                      'after xx days')
@@ -130,8 +139,15 @@ class DbBackup(models.Model):
             try:
                 # try to backup database and write it away
                 fp = open(file_path, 'wb')
-                self._take_dump(rec.name, fp, 'db.backup', rec.backup_type)
-                fp.close()
+                if rec.backup_type == 'zip' and rec.incremental_filestore:
+                    chain = rec._get_filestore_chain()
+                    filestore_chain = {'parent': chain and chain['backups'][-1], 'files': chain and chain['files'] or {}}
+                    files = self._take_dump(rec.name, fp, 'db.backup', rec.backup_type, filestore_chain=filestore_chain)
+                    fp.close()
+                    rec._set_filestore_chain((chain and chain['backups'] or []) + [bkp_file], files)
+                else:
+                    self._take_dump(rec.name, fp, 'db.backup', rec.backup_type)
+                    fp.close()
             except Exception as error:
                 _logger.debug(
                     "Couldn't backup database %s. Bad database administrator password for server running at "
@@ -198,10 +214,12 @@ class DbBackup(models.Model):
                     sftp.chdir(path_to_write_to)
 
                     _logger.debug("Checking expired files")
+                    # Backups of the current incremental chain are needed to restore the latest one
+                    chain_backups = rec._get_filestore_chain_backups()
                     # Loop over all files in the directory from the back-ups.
                     # We will check the creation date of every back-up.
                     for file in sftp.listdir(path_to_write_to):
-                        if rec.name in file:
+                        if rec.name in file and file not in chain_backups:
                             # Get the full path
                             fullpath = os.path.join(path_to_write_to, file)
                             # Get the timestamp from the file on the external server
@@ -250,22 +268,97 @@ class DbBackup(models.Model):
             # Remove all old files (on local server) in case this is configured..
             if rec.autoremove:
                 directory = rec.folder
+                chain_backups = rec._get_filestore_chain_backups()
                 # Loop over all files in the directory.
                 for f in os.listdir(directory):
                     fullpath = os.path.join(directory, f)
+                    # Only files are backups, the incremental chains directory is never removed
+                    if f == '.filestore_chains' or not os.path.isfile(fullpath):
+                        continue
                     # Only delete the ones wich are from the current database
                     # (Makes it possible to save different databases in the same folder)
-                    if rec.name in fullpath:
+                    # and keep the ones the latest incremental backup depends on
+                    if rec.name in fullpath and f not in chain_backups:
                         timestamp = os.stat(fullpath).st_ctime
                         createtime = datetime.datetime.fromtimestamp(timestamp)
                         now = datetime.datetime.now()
                         delta = now - createtime
                         if delta.days >= rec.days_to_keep:
-                            # Only delete files (which are .dump and .zip), no directories.
-                            if os.path.isfile(fullpath) and (".dump" in f or '.zip' in f):
+                            # Only delete the .dump and .zip files.
+                            if ".dump" in f or '.zip' in f:
                                 _logger.info("Delete local out-of-date file: %s", fullpath)
                                 os.remove(fullpath)
 
+    def _get_filestore_chain_path(self):
+        self.ensure_one()
+        # Kept in a sub directory, so it is neither sent to the SFTP server nor removed with the backups
+        return os.path.join(self.folder, '.filestore_chains', '%s.json' % self.name)
+
+    def _get_filestore_chain(self):
+        """Return the incremental chain the next backup should be added to, as a dict with the file names of
+        its backups ('backups') and the filestore files of its latest backup ('files'), or None when the next
+        backup has to be a full one."""
+        self.ensure_one()
+        path = self._get_filestore_chain_path()
+        if not os.path.isfile(path):
+            return None
+        with open(path) as fh:
+            chain = json.load(fh)
+        if len(chain['backups']) >= max(self.full_backup_interval, 1):
+            return None
+        # A missing backup breaks the chain
+        if any(not os.path.isfile(os.path.join(self.folder, backup)) for backup in chain['backups']):
+            return None
+        return chain
+
+    def _set_filestore_chain(self, backups, files):
+        self.ensure_one()
+        path = self._get_filestore_chain_path()
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as fh:
+            json.dump({'backups': backups, 'files': files}, fh)
+
+    def _get_filestore_chain_backups(self):
+        self.ensure_one()
+        path = self._get_filestore_chain_path()
+        if not self.incremental_filestore or not os.path.isfile(path):
+            return []
+        with open(path) as fh:
+            return json.load(fh)['backups']
+
+    @api.model
+    def restore_filestore_chain(self, backup_path, stream):
+        """Write into the file-like object `stream` a full zip backup, that can be restored with the database
+        manager, from the incremental backup `backup_path`: the filestore files it does not contain are taken
+        from the previous backups of its chain, which must be in the same directory."""
+        folder = os.path.dirname(backup_path)
+        with zipfile.ZipFile(backup_path) as zipf:
+            missing = set(json.loads(zipf.read('filestore_manifest.json'))['files'])
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zip_out:
+            current = backup_path
+            while current:
+                with zipfile.ZipFile(current) as zipf:
+                    names = zipf.namelist()
+                    if current == backup_path:
+                        for name in ('dump.sql', 'manifest.json'):
+                            self._copy_zip_member(zipf, zip_out, name)
+                    for name in names:
+                        if name.startswith('filestore/') and name[len('filestore/'):] in missing:
+                            self._copy_zip_member(zipf, zip_out, name)
+                            missing.discard(name[len('filestore/'):])
+                    parent = 'filestore_manifest.json' in names and \
+                        json.loads(zipf.read('filestore_manifest.json'))['parent']
+                current = missing and parent and os.path.join(folder, parent)
+        if missing:
+            raise Warning(_('The backup chain of %s is incomplete, %s filestore files are missing.')
+                          % (backup_path, len(missing)))
+
+    @api.model
+    def _copy_zip_member(self, zip_in, zip_out, name):
+        with zip_in.open(name) as src, zip_out.open(name, 'w', force_zip64=True) as dst:
+            shutil.copyfileobj(src, dst)
+
     # This is more or less the same as the default Odoo function at
     # https://github.com/odoo/odoo/blob/e649200ab44718b8faefc11c2f8a9d11f2db7753/odoo/service/db.py#L209
     # The main difference is that we do not do have a wrapper for the function check_db_management_enabled here and
@@ -273,9 +366,13 @@ class DbBackup(models.Model):
     # call. Since this function is called from the cron and since we have these security checks on model and on user_id
     # its pretty impossible to hack any way to take a backup. This allows us to disable the Odoo database manager
     # which is a MUCH safer way
-    def _take_dump(self, db_name, stream, model, backup_format='zip'):
+    def _take_dump(self, db_name, stream, model, backup_format='zip', filestore_chain=None):
         """Dump database `db` into file-like object `stream` if stream is None
-        return a file object with the dump """
+        return a file object with the dump
+
+        With `filestore_chain` (a dict with the file name of the previous backup as 'parent' and its filestore
+        files as 'files'), the zip only contains the filestore files that are not in the previous backup, and
+        the filestore files of the database are returned. """
 
         cron_user_id = self.env.ref('auto_backup.backup_scheduler').user_id.id
         if self._name != 'db.backup' or cron_user_id != self.env.user.id:
@@ -290,8 +387,6 @@ class DbBackup(models.Model):
         if backup_format == 'zip':
             with tempfile.TemporaryDirectory() as dump_dir:
                 filestore = odoo.tools.config.filestore(db_name)
-                if os.path.exists(filestore):
-                    shutil.copytree(filestore, os.path.join(dump_dir, 'filestore'))
                 with open(os.path.join(dump_dir, 'manifest.json'), 'w') as fh:
                     db = odoo.sql_db.db_connect(db_name)
                     with db.cursor() as cr:
@@ -299,10 +394,12 @@ class DbBackup(models.Model):
                 cmd.insert(-1, '--file=' + os.path.join(dump_dir, 'dump.sql'))
                 odoo.tools.exec_pg_command(*cmd)
                 if stream:
-                    odoo.tools.osutil.zip_dir(dump_dir, stream, include_dir=False, fnct_sort=lambda file_name: file_name != 'dump.sql')
+                    files = self._zip_dump(dump_dir, filestore, stream, filestore_chain)
+                    if filestore_chain is not None:
+                        return files
                 else:
                     t=tempfile.TemporaryFile()
-                    odoo.tools.osutil.zip_dir(dump_dir, t, include_dir=False, fnct_sort=lambda file_name: file_name != 'dump.sql')
+                    self._zip_dump(dump_dir, filestore, t, filestore_chain)
                     t.seek(0)
                     return t
         else:
@@ -313,6 +410,33 @@ class DbBackup(models.Model):
             else:
                 return stdout
 
+    def _zip_dump(self, dump_dir, filestore, stream, filestore_chain=None):
+        """Zip the dump and the filestore into `stream`, the filestore being read in place instead of being
+        copied next to the dump first. Filestore files are named after their checksum, so the ones already
+        listed with the same size in filestore_chain['files'] are not added again.
+        Returns a dict {path in the filestore: size} of all the filestore files. """
+        files = {}
+        previous_files = filestore_chain and filestore_chain['files'] or {}
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zipf:
+            zipf.write(os.path.join(dump_dir, 'dump.sql'), 'dump.sql')
+            zipf.write(os.path.join(dump_dir, 'manifest.json'), 'manifest.json')
+            for dirpath, dirnames, filenames in os.walk(filestore):
+                dirnames.sort()
+                for file_name in sorted(filenames):
+                    path = os.path.join(dirpath, file_name)
+                    if not os.path.isfile(path):
+                        continue
+                    name = os.path.relpath(path, filestore).replace(os.sep, '/')
+                    files[name] = os.path.getsize(path)
+                    if previous_files.get(name) != files[name]:
+                        zipf.write(path, 'filestore/' + name)
+            if filestore_chain is not None:
+                zipf.writestr('filestore_manifest.json', json.dumps({
+                    'parent': filestore_chain.get('parent') or False,
+                    'files': files,
+                }))
+        return files
+
     def _dump_db_manifest(self, cr):
         pg_version = "%d.%d" % divmod(cr._obj.connection.server_version / 100, 100)
         cr.execute("SELECT name, latest_version FROM ir_module_module WHERE state = 'installed'")
@@ -13,4 +13,7 @@ class AccountJournal(models.Model):
     tax_account_id = fields.Many2one('account.account', string='Tax Account')
     fees_percent = fields.Float('Fees (%)')
     fees_amount = fields.Float('Fees Fixed Amount')
+    fees_summary = fields.Boolean('Summarize Fees',
+                                  help='Post the bank fees of the payments with one summary entry per day instead '
+                                       'of one entry per payment.')
 
@@ -40,12 +40,15 @@ class AccountPayment(models.Model):
             self.fees_percent = self.journal_id.fees_percent
             self.fees_amount = self.journal_id.fees_amount
 
-    def create_fees_entry(self, percent, fixed):
+    def _prepare_fees_lines(self, percent, fixed):
+        """ Journal items of the bank fees of the payment: the percent and
+        fixed fees, their tax and the bank counterpart. """
+        self.ensure_one()
         total = 0.0
         vals = []
         if percent > 0.0:
             total += percent
-            vals.append((0, 0, {
+            vals.append({
                 'name': 'Bank Percent Fees',
                 'account_id': self.fees_percent_account_id.id,
                 'debit': percent,
@@ -53,10 +56,10 @@ class AccountPayment(models.Model):
                 'journal_id': self.journal_id.id,
                 'partner_id': self.partner_id.id,
                 'currency_id': self.currency_id.id,
-            }))
+            })
         if fixed > 0.0:
             total += fixed
-            vals.append((0, 0, {
+            vals.append({
                 'name': 'Bank Fixed Fees',
                 'account_id': self.fees_fixed_account_id.id,
                 'debit': fixed,
@@ -64,10 +67,10 @@ class AccountPayment(models.Model):
                 'journal_id': self.journal_id.id,
                 'partner_id': self.partner_id.id,
                 'currency_id': self.currency_id.id,
-            }))
+            })
         if total > 0.0:
             tax = total * (self.tax_id.amount/100)
-            vals.append((0, 0, {
+            vals.append({
                 'name': self.tax_id.description,
                 'account_id': self.tax_account_id.id,
                 'debit': tax,
@@ -75,8 +78,8 @@ class AccountPayment(models.Model):
                 'journal_id': self.journal_id.id,
                 'partner_id': self.partner_id.id,
                 'currency_id': self.currency_id.id,
-            }))
-            vals.append((0, 0, {
+            })
+            vals.append({
                 'name': 'Bank Fees',
                 'account_id': self.journal_id.default_account_id.id,
                 'debit': 0.0,
@@ -84,17 +87,67 @@ class AccountPayment(models.Model):
                 'journal_id': self.journal_id.id,
                 'partner_id': self.partner_id.id,
                 'currency_id': self.currency_id.id,
-            }))
-        if vals:
-            move_vals = {
-                'ref': _('Bank Fees %s') % self.name,
-                'date': self.date,
-                'journal_id': self.journal_id.id,
-                'line_ids': vals,
-            }
-            fees_move_id = self.env['account.move'].create(move_vals)
-            fees_move_id.post()
-            self.fees_move_id = fees_move_id.id
+            })
+        return vals
+
+    @api.model
+    def _summarize_fees_lines(self, lines):
+        """ Merge the fees lines of several payments by account, label and
+        currency, for a summary entry. """
+        summary = {}
+        for line in lines:
+            key = (line['account_id'], line['name'], line['currency_id'])
+            if key not in summary:
+                summary[key] = dict(line, partner_id=False, debit=0.0, credit=0.0)
+            summary[key]['debit'] += line['debit']
+            summary[key]['credit'] += line['credit']
+        return list(summary.values())
+
+    @api.model
+    def _create_fees_entries(self, fees):
+        """ Create and post the bank fees entries of many payments at once.
+
+        :param fees: list of ``(payment, percent, fixed)``
+        Payments of journals summarizing their fees share one entry per
+        journal and date, the others get an entry each.
+        """
+        moves_vals = []
+        moves_payments = []
+        summaries = {}
+        for payment, percent, fixed in fees:
+            lines = payment._prepare_fees_lines(percent, fixed)
+            if not lines:
+                continue
+            if payment.journal_id.fees_summary:
+                summary = summaries.setdefault((payment.journal_id, payment.date), ([], []))
+                summary[0].append(payment.id)
+                summary[1].extend(lines)
+                continue
+            moves_vals.append({
+                'ref': _('Bank Fees %s') % payment.name,
+                'date': payment.date,
+                'journal_id': payment.journal_id.id,
+                'line_ids': [(0, 0, line) for line in lines],
+            })
+            moves_payments.append(payment)
+        for (journal, date), (payment_ids, lines) in summaries.items():
+            moves_vals.append({
+                'ref': _('Bank Fees %s') % date,
+                'date': date,
+                'journal_id': journal.id,
+                'line_ids': [(0, 0, line) for line in self._summarize_fees_lines(lines)],
+            })
+            moves_payments.append(self.browse(payment_ids))
+        if not moves_vals:
+            return self.env['account.move']
+        fees_moves = self.env['account.move'].create(moves_vals)
+        fees_moves._post(soft=False)
+        for fees_move, payments in zip(fees_moves, moves_payments):
+            payments.fees_move_id = fees_move
+        return fees_moves
+
+    def create_fees_entry(self, percent, fixed):
+        self._create_fees_entries([(self, percent, fixed)])
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -110,10 +163,11 @@ class AccountPayment(models.Model):
 
     def action_post(self):
         res = super(AccountPayment, self).action_post()
+        fees = []
         for payment in self.filtered(lambda p: p.have_fees and p.payment_type == "outbound"):
-            fees = ((payment.fees_percent / 100) * payment.amount) if payment.fees_percent > 0.0 else 0.0
-            commission = payment.fees_amount
-            payment.create_fees_entry(fees, commission)
+            percent = ((payment.fees_percent / 100) * payment.amount) if payment.fees_percent > 0.0 else 0.0
+            fees.append((payment, percent, payment.fees_amount))
+        self._create_fees_entries(fees)
         return res
 
 
@@ -146,67 +200,20 @@ class AccountPaymentRegister(models.TransientModel):
             self.fees_amount = self.journal_id.fees_amount
 
     def create_fees_entry(self, percent, fixed,payment):
-        total = 0.0
-        vals = []
-        if percent > 0.0:
-            total += percent
-            vals.append((0, 0, {
-                'name': 'Bank Percent Fees',
-                'account_id': self.fees_percent_account_id.id,
-                'debit': percent,
-                'credit': 0.0,
-                'journal_id': self.journal_id.id,
-                'partner_id': self.partner_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if fixed > 0.0:
-            total += fixed
-            vals.append((0, 0, {
-                'name': 'Bank Fixed Fees',
-                'account_id': self.fees_fixed_account_id.id,
-                'debit': fixed,
-                'credit': 0.0,
-                'journal_id': self.journal_id.id,
-                'partner_id': self.partner_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if total > 0.0:
-            tax = total * (self.tax_id.amount/100)
-            vals.append((0, 0, {
-                'name': self.tax_id.description,
-                'account_id': self.tax_account_id.id,
-                'debit': tax,
-                'credit': 0.0,
-                'journal_id': self.journal_id.id,
-                'partner_id': self.partner_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-            vals.append((0, 0, {
-                'name': 'Bank Fees',
-                'account_id': self.journal_id.default_account_id.id,
-                'debit': 0.0,
-                'credit': total + tax,
-                'journal_id': self.journal_id.id,
-                'partner_id': self.partner_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if vals:
-            move_vals = {
-                'ref': _('Bank Fees %s') % payment.name,
-                'date': self.payment_date,
-                'journal_id': self.journal_id.id,
-                'line_ids': vals,
-            }
-            fees_move_id = self.env['account.move'].create(move_vals)
-            fees_move_id.post()
-            payment.fees_move_id = fees_move_id.id
-
-    def _create_payments(self):
-        payments = super(AccountPaymentRegister, self)._create_payments()
-        for pay in payments:
-            if self.have_fees and self.payment_type == "outbound" and len(payments) == 1:
-                fees = ((self.fees_percent / 100) * self.amount) if self.fees_percent > 0.0 else 0.0
-                commission = self.fees_amount
-                self.create_fees_entry(fees, commission,pay)
-
-        return payments
\ No newline at end of file
+        self.env['account.payment']._create_fees_entries([(payment, percent, fixed)])
+
+    def _get_fees_payment_vals(self):
+        if self.have_fees and self.payment_type == "outbound":
+            return {'fees_percent': self.fees_percent, 'fees_amount': self.fees_amount}
+        return {}
+
+    def _create_payment_vals_from_wizard(self):
+        # the fees are posted with the payments, see AccountPayment.action_post
+        payment_vals = super(AccountPaymentRegister, self)._create_payment_vals_from_wizard()
+        payment_vals.update(self._get_fees_payment_vals())
+        return payment_vals
+
+    def _create_payment_vals_from_batch(self, batch_result):
+        payment_vals = super(AccountPaymentRegister, self)._create_payment_vals_from_batch(batch_result)
+        payment_vals.update(self._get_fees_payment_vals())
+        return payment_vals
@@ -15,7 +15,109 @@ import re
 import subprocess
 import os
 import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+_logger = logging.getLogger(__name__)
+
+# connect and read timeouts of the Data Lake requests, in seconds
+DATALAKE_TIMEOUT = (10, 120)
+# number of pages fetched at the same time
+DATALAKE_MAX_WORKERS = 4
+
+# Data Lake clients kept between the cron runs, by (database, company id)
+_datalake_clients = {}
+_datalake_clients_lock = threading.Lock()
+
+
+class DatalakeClient(object):
+    """
+    HTTP client of the Data Lake endpoints of a company. It is kept between the cron runs
+    to reuse its connections, retries the failed requests with a backoff, refreshes the
+    token when it is rejected and counts the requests, bytes and time spent fetching.
+    """
+
+    def __init__(self, url, username, password):
+        self.credentials = (url, username, password)
+        self.token = None
+        self.lock = threading.Lock()
+        self.token_lock = threading.Lock()
+        self.metrics = {'requests': 0, 'bytes': 0, 'seconds': 0.0}
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET', 'POST']))
+        adapter = HTTPAdapter(pool_connections=DATALAKE_MAX_WORKERS, pool_maxsize=DATALAKE_MAX_WORKERS, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _request(self, method, url, **kwargs):
+        start = time.time()
+        response = self.session.request(method, url, timeout=DATALAKE_TIMEOUT, **kwargs)
+        elapsed = time.time() - start
+        with self.lock:
+            self.metrics['requests'] += 1
+            self.metrics['bytes'] += len(response.content)
+            self.metrics['seconds'] += elapsed
+        _logger.debug('Data Lake %s %s: %s bytes in %.3fs', method, url, len(response.content), elapsed)
+        return response
+
+    def get_token(self):
+        """
+        Authenticate to Data Lake API and get token.
+        """
+        url, username, password = self.credentials
+        # API uses JSON.
+        headers = {'content-type': 'application/json', 'accept': 'application/json'}
+        # Send HTTP POST with username and password.
+        response = self._request('POST', url, auth=HTTPBasicAuth(username, password), headers=headers)
+        response.raise_for_status()
+        self.token = response.json()["Token"]
+        return self.token
+
+    def _get(self, url):
+        """
+        GET an endpoint with the current token, authenticating again once when the
+        token is rejected.
+        """
+        with self.token_lock:
+            if not self.token:
+                self.get_token()
+            token = self.token
+        response = self._get_with_token(url, token)
+        if response.status_code == 401:
+            with self.token_lock:
+                # another thread may have refreshed it meanwhile
+                if self.token == token:
+                    self.get_token()
+                token = self.token
+            response = self._get_with_token(url, token)
+        response.raise_for_status()
+        return response.json()
+
+    def _get_with_token(self, url, token):
+        # Include the token in the header.
+        headers = {'content-type': 'application/json', 'Authorization': 'Bearer ' + str(token)}
+        return self._request('GET', url, headers=headers, verify=False)
+
+    def get_pages(self, urls):
+        """
+        Yield the rows of the pages of the given urls, following the 'next' url of
+        paginated results. The urls are fetched concurrently, the pages are yielded
+        as they arrive.
+        """
+        with ThreadPoolExecutor(DATALAKE_MAX_WORKERS) as executor:
+            futures = {executor.submit(self._get, url) for url in urls if url}
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    response_as_dict = future.result()
+                    if response_as_dict.get('next'):
+                        futures.add(executor.submit(self._get, response_as_dict['next']))
+                    yield response_as_dict['rows']
 
 
 class ResCompany(models.Model):
@@ -30,6 +132,27 @@ class ResCompany(models.Model):
     datalake_password = fields.Char('Password')
     datalake_token = fields.Text('Token')
     datalake_warehouse_id = fields.Many2one('stock.warehouse',string='Warehouse')
+    datalake_order_date = fields.Date('Orders Synchronized Until',
+        help="Date of the latest order fetched from Data Lake, the next synchronization starts from it.")
+
+    def _get_datalake_client(self):
+        self.ensure_one()
+        key = (self.env.cr.dbname, self.id)
+        credentials = (self.datalake_url, self.datalake_username, self.datalake_password)
+        with _datalake_clients_lock:
+            client = _datalake_clients.get(key)
+            if not client or client.credentials != credentials:
+                client = _datalake_clients[key] = DatalakeClient(*credentials)
+        if not client.token:
+            client.token = self.datalake_token
+        return client
+
+    def get_datalake_metrics(self):
+        """
+        Requests, bytes and seconds spent fetching the Data Lake endpoints since the server started.
+        """
+        self.ensure_one()
+        return dict(self._get_datalake_client().metrics)
 
     def get_token(self):
         self.ensure_one()
@@ -37,46 +160,56 @@ class ResCompany(models.Model):
         """
         Authenticate to Data Lake API and get token.
         """
-        url = self.datalake_url
-        # API uses JSON.
-        headers = {'content-type': 'application/json','accept': 'application/json'}
-        # Send HTTP POST with username and password.
-        response = requests.request("POST",
-                                    url,
-                                    auth=HTTPBasicAuth(self.datalake_username, self.datalake_password),
-                                    headers=headers)
-
+        token = self._get_datalake_client().get_token()
         # Save the token in a variable.
-        token = response.json()["Token"]
         self.datalake_token = token
         return token
 
-    def get_order_data_from_datalake(self):
+    def get_order_data_from_datalake(self, start_date=None):
         self.ensure_one()
         """
         Communicate with Data Lake to retrieve order information.
         """
-        # Include the token in the header.
-        headers = {'content-type': 'application/json', 'Authorization': 'Bearer '+str(self.datalake_token)}
-        # Send HTTP GET to retrieve endpoint.
-        url = self.datalake_order_api + str(
-            fields.Date.today())
-        response = requests.get(url, headers=headers, verify=False)
-        response_as_dict = response.json()  # convert JSON to DICT.
-        return response_as_dict['rows']
+        rows = []
+        for page in self.iter_order_pages_from_datalake(start_date):
+            rows += page
+        return rows
+
+    def iter_order_pages_from_datalake(self, start_date=None):
+        self.ensure_one()
+        """
+        Retrieve the orders from start_date (today by default) page by page.
+        """
+        url = self.datalake_order_api + str(start_date or fields.Date.today())
+        return self._iter_datalake_pages([url])
 
     def get_customer_data_from_datalake(self):
         self.ensure_one()
         """
         Communicate with Data Lake to retrieve order information.
         """
-        # Include the token in the header.
-        headers = {'content-type': 'application/json', 'Authorization': 'Bearer '+str(self.datalake_token)}
-        # Send HTTP GET to retrieve endpoint.
-        url = self.datalake_customer_api
-        response = requests.get(url, headers=headers, verify=False)
-        response_as_dict = response.json()  # convert JSON to DICT.
-        return response_as_dict['rows']
+        rows = []
+        for page in self.iter_customer_pages_from_datalake():
+            rows += page
+        return rows
+
+    def iter_customer_pages_from_datalake(self):
+        self.ensure_one()
+        return self._iter_datalake_pages([self.datalake_customer_api])
+
+    def _iter_datalake_pages(self, urls):
+        """
+        Yield the rows of Data Lake endpoints, one page at a time when an endpoint
+        paginates its result (the response then gives the url of the next page in 'next').
+        The pages of several urls are fetched concurrently.
+        """
+        client = self._get_datalake_client()
+        for rows in client.get_pages(urls):
+            yield rows
+        # keep the token the client may have refreshed
+        if client.token and client.token != self.datalake_token:
+            self.sudo().datalake_token = client.token
+        _logger.info('Data Lake metrics of %s: %s', self.name, client.metrics)
 
 
 
@@ -91,3 +224,4 @@ class ResConfigSettings(models.TransientModel):
     datalake_password = fields.Char(related='company_id.datalake_password', readonly=False)
     datalake_token = fields.Text(related='company_id.datalake_token', readonly=False)
     datalake_warehouse_id = fields.Many2one(related='company_id.datalake_warehouse_id', readonly=False)
+    datalake_order_date = fields.Date(related='company_id.datalake_order_date', readonly=False)
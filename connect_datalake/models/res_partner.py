@@ -28,10 +28,14 @@ import re
 _logger = logging.getLogger(__name__)
 
 
+# number of customers created in one transaction
+DATALAKE_BATCH_SIZE = 1000
+
+
 class ResPartner(models.Model):
     _inherit = 'res.partner'
 
-    data_id = fields.Char()
+    data_id = fields.Char(index=True)
 
 
 
@@ -40,16 +44,26 @@ class ResPartner(models.Model):
         companies=self.env['res.company'].search([('datalake_api','!=',False)])
         for company in companies:
             # base_api_endpoint = "http://172-105-48-123.ip.linodeusercontent.com:8000/datalake/getAssafCustomers"
-            partner_response=company.get_customer_data_from_datalake()
-            partner_ids = [l['customer_id'] for l in partner_response]
-            # pylint: disable=bad-continuation
-            odoo_partner_entries = self.env['res.partner'].sudo().search_read([('data_id', '!=', False)
-                                                                           ], ['data_id'])
-            odoo_ids = [u['data_id'] for u in odoo_partner_entries]
-            new_partner = set(partner_ids) - set(odoo_ids)
-            partner_obj = self.env['res.partner'].sudo()
-            for partner in partner_response:
-                if str(partner['customer_id']) in new_partner:
-                    partner_obj.create({'data_id': str(partner['customer_id']),
-                                                  'name': str(partner['first_name']) + " " + str(
-                                                      partner['last_name']),})
\ No newline at end of file
+            for partner_response in company.iter_customer_pages_from_datalake():
+                for index in range(0, len(partner_response), DATALAKE_BATCH_SIZE):
+                    self._import_datalake_partners(partner_response[index:index + DATALAKE_BATCH_SIZE])
+                    if not self.env.registry.in_test_mode():
+                        self.env.cr.commit()
+
+    @api.model
+    def _import_datalake_partners(self, partner_response):
+        """
+        Create at once the customers of partner_response which are not imported yet.
+        """
+        partner_obj = self.env['res.partner'].sudo()
+        partner_ids = list({str(partner['customer_id']) for partner in partner_response})
+        # pylint: disable=bad-continuation
+        odoo_ids = set(partner_obj.search([('data_id', 'in', partner_ids)]).mapped('data_id'))
+        vals_list = []
+        for partner in partner_response:
+            if str(partner['customer_id']) not in odoo_ids:
+                odoo_ids.add(str(partner['customer_id']))
+                vals_list.append({'data_id': str(partner['customer_id']),
+                                  'name': str(partner['first_name']) + " " + str(
+                                      partner['last_name']),})
+        return partner_obj.create(vals_list)
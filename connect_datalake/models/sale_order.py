@@ -69,10 +69,14 @@ from odoo.tools import DEFAULT_SERVER_DATE_FORMAT as DATE_FORMAT
 import re
 
 
+# number of orders created and confirmed in one transaction
+DATALAKE_BATCH_SIZE = 500
+
+
 class SaleOrder(models.Model):
     _inherit = "sale.order"
 
-    data_id = fields.Char()
+    data_id = fields.Char(index=True)
     payment_method = fields.Char()
 
 
@@ -81,46 +85,112 @@ class SaleOrder(models.Model):
         companies=self.env['res.company'].search([('datalake_api','!=',False)])
         for company in companies:
             # base_api_endpoint = "http://172-105-48-123.ip.linodeusercontent.com:8000/datalake/getAssafOrders?start_date="+str(fields.Date.today())
-            order_response=company.get_order_data_from_datalake()
-            order_ids = [str(l['data_id']) for l in order_response]
-            # pylint: disable=bad-continuation
-            odoo_sale_entries = self.env['sale.order'].sudo().search_read([('data_id', '!=', False)
-                                                                           ], ['data_id'])
-            odoo_ids = [u['data_id'] for u in odoo_sale_entries]
-            new_sale = set(order_ids) - set(odoo_ids)
-            product_obj = self.env['product.product'].sudo()
-            partner_obj = self.env['res.partner'].sudo()
-            sale_obj = self.env['sale.order'].sudo()
-            for order in order_response:
-                if str(order['data_id']) in new_sale:
-                    partner=partner_obj.search([('data_id','=',str(order['data_customer_id']))])
-                    if not partner:
-                        partner=partner_obj.create({'data_id':str(order['data_customer_id']),
-                                                    'name':str(order['data_customer_first_name'])+" "+str(order['data_customer_last_name']),
-                                                    'mobile':str(order['data_customer_mobile']),'city':str(order['data_customer_city'])})
-                    vals=[]
-                    for line in order['data_items']:
-                        product_id = product_obj.search(
-                            ['|',('name', '=', line['product.name']),('default_code', '=', line['product.sku'])], limit=1)
-                        if product_id:
-                            vals.append((0,0,{'product_id':product_id.id,
-                                              'name':product_id.name,
-                                              'product_uom':product_id.uom_id.id,
-                                              'product_uom_qty': line['quantity'],
-                                              'price_unit': line['amounts.price_without_tax.amount'],
-                                              'discount': line['quantity'],
-                                              'tax_id':[(4, product_id.taxes_id.id)] if product_id.taxes_id else False}))
-                    if vals:
-                        sale_order = sale_obj.create({'partner_id': partner.id,
-                                                      'data_id':str(order['data_id']),
-                                                      'warehouse_id':company.datalake_warehouse_id.id,
-                                                      'picking_policy': 'direct',
-                                                      'client_order_ref':str(order['data_reference_id']),
-                                                      'date_order': order['data_date_date'][:19],
-                                                      'pricelist_id': partner.property_product_pricelist.id,
-                                                      'company_id':company.id,
-                                                      'payment_method':order['data_payment_method'],
-                                                      'order_line':vals,
-                                                      })
-                        sale_order.action_confirm()
+            # start from the last synchronized day, orders already imported are skipped
+            for order_response in company.iter_order_pages_from_datalake(company.datalake_order_date):
+                for index in range(0, len(order_response), DATALAKE_BATCH_SIZE):
+                    self._import_datalake_orders(company, order_response[index:index + DATALAKE_BATCH_SIZE])
+                    if not self.env.registry.in_test_mode():
+                        self.env.cr.commit()
+
+    @api.model
+    def _get_datalake_products(self, order_response):
+        """
+        Map the product name and sku of the order items to the first product
+        having this name or this reference, with one search for all the orders.
+        """
+        names = set()
+        skus = set()
+        for order in order_response:
+            for line in order['data_items']:
+                names.add(line['product.name'])
+                skus.add(line['product.sku'])
+        products_by_name = {}
+        products_by_sku = {}
+        sequence = {}
+        if names or skus:
+            products = self.env['product.product'].sudo().search(
+                ['|', ('name', 'in', list(names)), ('default_code', 'in', list(skus))])
+            for product in products:
+                products_by_name.setdefault(product.name, product)
+                if product.default_code:
+                    products_by_sku.setdefault(product.default_code, product)
+            sequence.update((product.id, index) for index, product in enumerate(products))
+
+        def get_product(line):
+            candidates = [product for product in (products_by_name.get(line['product.name']),
+                                                  products_by_sku.get(line['product.sku'])) if product]
+            return min(candidates, key=lambda product: sequence[product.id]) if candidates else False
+        return get_product
+
+    @api.model
+    def _get_datalake_partners(self, order_response):
+        """
+        Map the customer ids of the orders to their partner, creating the missing ones at once.
+        """
+        partner_obj = self.env['res.partner'].sudo()
+        customer_ids = list({str(order['data_customer_id']) for order in order_response})
+        partners = {partner.data_id: partner for partner in partner_obj.search([('data_id', 'in', customer_ids)])}
+        vals_list = []
+        for order in order_response:
+            customer_id = str(order['data_customer_id'])
+            if customer_id not in partners:
+                partners[customer_id] = False
+                vals_list.append({'data_id':customer_id,
+                                  'name':str(order['data_customer_first_name'])+" "+str(order['data_customer_last_name']),
+                                  'mobile':str(order['data_customer_mobile']),'city':str(order['data_customer_city'])})
+        for partner in partner_obj.create(vals_list):
+            partners[partner.data_id] = partner
+        return partners
+
+    @api.model
+    def _import_datalake_orders(self, company, order_response):
+        """
+        Create and confirm the orders of order_response which are not imported yet.
+        """
+        sale_obj = self.env['sale.order'].sudo()
+        order_ids = list({str(order['data_id']) for order in order_response})
+        imported = set(sale_obj.search([('data_id', 'in', order_ids)]).mapped('data_id'))
+        new_orders = []
+        for order in order_response:
+            if str(order['data_id']) not in imported:
+                imported.add(str(order['data_id']))
+                new_orders.append(order)
+        if not new_orders:
+            return sale_obj
+
+        partners = self._get_datalake_partners(new_orders)
+        get_product = self._get_datalake_products(new_orders)
+        vals_list = []
+        for order in new_orders:
+            partner = partners[str(order['data_customer_id'])]
+            vals=[]
+            for line in order['data_items']:
+                product_id = get_product(line)
+                if product_id:
+                    vals.append((0,0,{'product_id':product_id.id,
+                                      'name':product_id.name,
+                                      'product_uom':product_id.uom_id.id,
+                                      'product_uom_qty': line['quantity'],
+                                      'price_unit': line['amounts.price_without_tax.amount'],
+                                      'discount': line['quantity'],
+                                      'tax_id':[(4, product_id.taxes_id.id)] if product_id.taxes_id else False}))
+            if vals:
+                vals_list.append({'partner_id': partner.id,
+                                  'data_id':str(order['data_id']),
+                                  'warehouse_id':company.datalake_warehouse_id.id,
+                                  'picking_policy': 'direct',
+                                  'client_order_ref':str(order['data_reference_id']),
+                                  'date_order': order['data_date_date'][:19],
+                                  'pricelist_id': partner.property_product_pricelist.id,
+                                  'company_id':company.id,
+                                  'payment_method':order['data_payment_method'],
+                                  'order_line':vals,
+                                  })
+        sale_orders = sale_obj.create(vals_list)
+        sale_orders.action_confirm()
 
+        # move the high-water mark to the latest order of the batch
+        last_date = fields.Date.to_date(max(order['data_date_date'][:10] for order in new_orders))
+        if not company.datalake_order_date or company.datalake_order_date < last_date:
+            company.sudo().datalake_order_date = last_date
+        return sale_orders
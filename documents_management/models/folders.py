@@ -1,4 +1,4 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
 
 class DocumentFolder(models.Model):
@@ -71,16 +71,34 @@ class DocumentFolder(models.Model):
         }
         return res
 
+    @api.model
+    @tools.ormcache()
+    def _get_folder_by_model(self):
+        """ Map the model names to the id of their directory. """
+        folders = self.sudo().search([('model_id', '!=', False)])
+        return {folder.model_id.model: folder.id for folder in folders}
+
     @api.model
     def create(self,vals):
         result = super(DocumentFolder, self).create(vals)        
-        attachments = self.env['ir.attachment'].sudo().search([])
+        self.clear_caches()
         model_id = vals.get('model_id' ,False)
         if model_id:
-            for attachment in attachments:
-                model = self.env['ir.model'].sudo().search([('id', '=', model_id)], limit=1)            
-                if model and attachment.res_model == model.model:
-                    attachment.sudo().write({
-                        'folder_id': result.id
-                    })
+            model = self.env['ir.model'].sudo().browse(model_id)
+            attachments = self.env['ir.attachment'].sudo().search([('res_model', '=', model.model)])
+            if attachments:
+                attachments.write({
+                    'folder_id': result.id
+                })
         return result
+
+    def write(self, vals):
+        res = super(DocumentFolder, self).write(vals)
+        if 'model_id' in vals:
+            self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(DocumentFolder, self).unlink()
+        self.clear_caches()
+        return res
@@ -23,38 +23,77 @@ class IrAttachment(models.Model):
             self.sudo().write({'access_token': str(uuid.uuid4())})
         return self.access_token
         
-    @api.model
-    def create(self,vals):
+    def init(self):
+        super(IrAttachment, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS ir_attachment_documents_version_idx
+                ON ir_attachment (name, COALESCE(res_model, ''), COALESCE(res_id, 0), id)
+             WHERE res_field IS NULL
+        """)
 
-        model = vals.get('res_model',False)
-        name = vals.get('name',False)
-        res_id = vals.get('res_id',False)
+    @api.model
+    def _get_next_versions(self, vals_list):
+        """ Version of each attachment of ``vals_list``: the version of the
+        last attachment with the same name on the same record plus one, in a
+        single query for the whole batch. """
+        keys = [
+            (vals['name'], vals.get('res_model') or '', vals.get('res_id') or 0) if vals.get('name') else None
+            for vals in vals_list
+        ]
+        last_versions = {}
+        existing_keys = tuple(set(key for key in keys if key))
+        if existing_keys:
+            self.flush(['name', 'res_model', 'res_id', 'res_field', 'version'])
+            self._cr.execute("""
+                SELECT DISTINCT ON (name, COALESCE(res_model, ''), COALESCE(res_id, 0))
+                       name, COALESCE(res_model, ''), COALESCE(res_id, 0), version
+                  FROM ir_attachment
+                 WHERE res_field IS NULL
+                   AND (name, COALESCE(res_model, ''), COALESCE(res_id, 0)) IN %s
+              ORDER BY name, COALESCE(res_model, ''), COALESCE(res_id, 0), id DESC
+            """, [existing_keys])
+            last_versions = {(name, model, res_id): version or 0
+                             for name, model, res_id, version in self._cr.fetchall()}
+        versions = []
+        for key in keys:
+            if not key:
+                versions.append(False)
+                continue
+            version = last_versions.get(key, 0) + 1
+            last_versions[key] = version
+            versions.append(version)
+        return versions
 
-        folder = self.env['documents.folder'].sudo().search([('model_id.model', '=', model)])
-        if folder:
-            vals.update({
-                'folder_id': folder.id
-            })                
-        
-        if name:
-            attachments = self.env['ir.attachment'].search([('name', '=', name),('res_model','=',model),('res_id','=',res_id)], order="id desc")
-            version =  False
-            if attachments:
-                last_attachment = self.env['ir.attachment'].browse(max(attachments.ids))                
-                version = last_attachment.version + 1
-            else:                
-                version = 1
-            
-            vals.update({
-                'version': version
-            })
+    @api.model
+    def _get_next_codes(self, count):
+        """ Allocate ``count`` document codes at once from the attachment
+        sequence. """
+        company_id = self.env.company.id
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'ir.attachment.code'),
+            ('company_id', 'in', [company_id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+        self._cr.execute("SELECT nextval('ir_sequence_%03d') FROM generate_series(1, %%s)" % sequence.id, [count])
+        return [sequence.get_next_char(number) for number, in self._cr.fetchall()]
 
-        code = self.env['ir.sequence'].next_by_code('ir.attachment.code')
-        if code:
-            vals.update({
-                'code' : code,
-            })
-        return super(IrAttachment, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        folder_by_model = self.env['documents.folder']._get_folder_by_model()
+        versions = self._get_next_versions(vals_list)
+        codes = self._get_next_codes(len(vals_list))
+        for vals, version, code in zip(vals_list, versions, codes):
+            folder_id = folder_by_model.get(vals.get('res_model'))
+            if folder_id:
+                vals['folder_id'] = folder_id
+            if version:
+                vals['version'] = version
+            if code:
+                vals['code'] = code
+        return super(IrAttachment, self).create(vals_list)
     
     def _find_mail_template(self):
         template_id = False
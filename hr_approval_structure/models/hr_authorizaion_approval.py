@@ -3,11 +3,11 @@
 
 import logging
 
+from collections import defaultdict
 from datetime import date, timedelta, datetime
 from pytz import timezone, utc
 
 from odoo import api, fields, models, _
-from odoo.tools.safe_eval import safe_eval
 from odoo.exceptions import UserError, AccessError
 
 LOGGER = logging.getLogger(__name__)
@@ -52,34 +52,46 @@ class AuthorizationApproval(models.Model):
 
     def _compute_approvals_number(self):
         """Compute total, remaining, and completed approvals."""
+        sequences = defaultdict(lambda: {'all': set(), 'todo': set(), 'done': set()})
+        if self.ids:
+            groups = self.env['hr.authorization.approval.line'].read_group([
+                ('res_model', '=', self._name),
+                ('res_id', 'in', self.ids),
+            ], ['res_id', 'sequence', 'status'], ['res_id', 'sequence', 'status'], lazy=False)
+            for group in groups:
+                record_sequences = sequences[group['res_id']]
+                record_sequences['all'].add(group['sequence'])
+                if group['status'] == 'pending':
+                    record_sequences['todo'].add(group['sequence'])
+                else:
+                    record_sequences['done'].add(group['sequence'])
         for record in self:
-            approvals = self.env['hr.authorization.approval.line'].search([
-                ('res_model', '=', record._name),
-                ('res_id', '=', record.id),
-            ], order='sequence ASC')
-            seqs = set(approvals.mapped('sequence'))
-            _todo = set(
-                approvals.filtered(lambda r: r.status == 'pending')
-                    .mapped('sequence')
-            )
-            _done = set(
-                approvals.filtered(lambda r: r.status != 'pending')
-                    .mapped('sequence')
-            )
-            todo = len(_todo - _done)
-            done = len(_done)
-            total = len(seqs)
-            record.approvals_todo = todo
-            record.approvals_done = done
-            record.approvals_count = total
+            record_sequences = sequences[record.id]
+            record.approvals_todo = len(record_sequences['todo'] - record_sequences['done'])
+            record.approvals_done = len(record_sequences['done'])
+            record.approvals_count = len(record_sequences['all'])
+
+    def _get_approval_lines(self):
+        """Return the approval lines of the records, grouped by record id."""
+        lines_by_record = defaultdict(lambda: self.env['hr.authorization.approval.line'])
+        if not self.ids:
+            return lines_by_record
+        lines = self.env['hr.authorization.approval.line'].search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+        ], order='sequence ASC')
+        line_ids_by_record = defaultdict(list)
+        for line in lines:
+            line_ids_by_record[line.res_id].append(line.id)
+        for res_id, line_ids in line_ids_by_record.items():
+            lines_by_record[res_id] = lines.browse(line_ids)
+        return lines_by_record
 
     def _compute_approval_line_ids(self):
         """Compute authorization approval lines."""
+        lines_by_record = self._get_approval_lines()
         for record in self:
-            approvals = self.env['hr.authorization.approval.line'].search([
-                ('res_model', '=', record._name),
-                ('res_id', '=', record.id),
-            ], order='sequence ASC')
+            approvals = lines_by_record[record.id]
             record.approval_line_ids = approvals
             record.approval_next_line_ids = approvals \
                 .filtered(lambda r: r.can_approve)
@@ -122,42 +134,58 @@ class AuthorizationApproval(models.Model):
         """Create approval lines from template.
 
         This should be called by children models to kick-off the approval
-        mandate process."""
-        for record in self:
-            # check if there's lines already created
-            # NOTE: That won't fix race condition issue (if any)
-            lines = self.env['hr.authorization.approval.line'].search([
-                ('res_model', '=', self._name),
-                ('res_id', '=', record.id),
-            ])
-            if lines:
-                continue
-
-            app_lines = []
-            if not template:
-                template = self.env['hr.authorization.approval.template'] \
-                    .search([
-                    ('res_model', '=', record._name),('company_id', '=', record.company_id.id)
-                ], limit=1)
-            if template:
-                record.approval_template_id = template.id
-                for line in template.line_ids:
-                    # check domain of each stage
-                    if line.domain and line.domain != '[]':
-                        res = record.search(safe_eval(line.domain))
-                        if record not in res:
-                            continue
-                    app_line = self.env['hr.authorization.approval.line'] \
-                        .create({
+        mandate process. Returns the created approval lines."""
+        Line = self.env['hr.authorization.approval.line']
+        # skip the records having lines already created
+        # NOTE: That won't fix race condition issue (if any)
+        existing = Line.search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+        ])
+        existing_ids = set(existing.mapped('res_id'))
+        records = self.filtered(lambda r: r.id not in existing_ids)
+
+        # group the records by approval template
+        templates = {}
+        records_by_template = defaultdict(list)
+        for record in records:
+            record_template = template
+            if not record_template:
+                if record.company_id not in templates:
+                    templates[record.company_id] = self.env['hr.authorization.approval.template'].search([
+                        ('res_model', '=', record._name), ('company_id', '=', record.company_id.id)
+                    ], limit=1)
+                record_template = templates[record.company_id]
+            if record_template:
+                records_by_template[record_template].append(record.id)
+
+        vals_list = []
+        for record_template, record_ids in records_by_template.items():
+            template_records = self.browse(record_ids)
+            template_records.write({'approval_template_id': record_template.id})
+            for line in record_template.line_ids:
+                # check domain of each stage
+                matching = template_records
+                if line.domain and line.domain != '[]':
+                    matching = template_records.filtered_domain(line._get_domain())
+                for record in matching:
+                    vals_list.append({
                         'res_model': record._name,
                         'res_id': record.id,
                         'template_line_id': line.id,
                     })
-                    app_lines.append(app_line)
-                # send the first notification after creation
-                if app_lines:
-                    app_lines[0].action_send_mail()
-            return app_lines
+        # sort by record first, keeping the template order of the stages
+        res_order = {res_id: index for index, res_id in enumerate(records.ids)}
+        vals_list.sort(key=lambda vals: res_order[vals['res_id']])
+        app_lines = Line.create(vals_list)
+
+        # send the first notification after creation
+        notified = set()
+        for app_line in app_lines:
+            if app_line.res_id not in notified:
+                notified.add(app_line.res_id)
+                app_line.action_send_mail()
+        return app_lines
 
     def action_open_approvals(self):
         """Open approval lines of the current record."""
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """Approval Template Models"""
 
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
+from odoo.tools.safe_eval import safe_eval
 
 
 class AuthorizationApprovalTemplate(models.Model):
@@ -70,6 +71,18 @@ class AuthorizationApprovalTemplateLine(models.Model):
     required = fields.Boolean("Required Stage", default=True)
     current_user = fields.Boolean("Current Direct Manager based", default=False)
 
+    @api.model
+    @tools.ormcache('domain')
+    def _parse_domain(self, domain):
+        """Evaluate a filter domain once, the result is shared, don't modify
+        it."""
+        return safe_eval(domain)
+
+    def _get_domain(self):
+        """Return the evaluated filter domain of the stage."""
+        self.ensure_one()
+        return self._parse_domain(self.domain or '[]')
+
     @api.onchange('department_id', 'parent_department_id', 'company_id',
                   'parent_company_id')
     def _onchange_department_id(self):
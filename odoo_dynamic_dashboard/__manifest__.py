@@ -21,7 +21,7 @@
 #############################################################################
 {
     'name': "Odoo Dynamic Dashboard",
-    'version': '15.0.1.0.1',
+    'version': '15.0.1.1.0',
     'summary': """Create Configurable Dashboards Easily""",
     'description': """Create Configurable Dashboard Dynamically to get the information that are relevant to your business, department, or a specific process or need, Dynamic Dashboard, Dashboard, Dashboard Odoo""",
     'author': 'Cybrosys Techno Solutions',
@@ -33,6 +33,7 @@
         'views/dynamic_block_view.xml',
         'views/dashboard_menu_view.xml',
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
     ],
     'assets': {
         'web.assets_backend': [
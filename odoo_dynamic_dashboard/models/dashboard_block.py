@@ -20,9 +20,24 @@
 #
 #############################################################################
 
+import json
+import logging
+import threading
+import time
+from ast import literal_eval
+from concurrent.futures import ThreadPoolExecutor
+
 from odoo import models, fields, api
 from odoo.osv import expression
-from ast import literal_eval
+from odoo.tools.date_utils import json_default
+
+_logger = logging.getLogger(__name__)
+
+DASHBOARD_MAX_WORKERS = 4
+
+# in-process cache of the block results, {key: (expires_at, values)}
+_block_cache = {}
+_block_cache_lock = threading.Lock()
 
 
 class DashboardBlock(models.Model):
@@ -70,11 +85,157 @@ class DashboardBlock(models.Model):
 
     sequence = fields.Integer(string="Sequence")
     edit_mode = fields.Boolean(default=False, invisible=True)
+    cache_ttl = fields.Integer(string="Cache Duration (s)", default=300,
+                               help='Seconds during which the computed values of the block are reused, 0 disables '
+                                    'the cache')
+    precompute = fields.Boolean(string="Precompute",
+                                help='Compute the values of the block periodically by a scheduled action instead '
+                                     'of when the dashboard is opened')
+    snapshot_ids = fields.One2many('dashboard.block.snapshot', 'block_id', string="Snapshots")
+
+    def write(self, vals):
+        res = super(DashboardBlock, self).write(vals)
+        self._invalidate_block_cache()
+        if self.ids:
+            self.env['dashboard.block.snapshot'].sudo().search([('block_id', 'in', self.ids)]).unlink()
+        return res
+
+    def unlink(self):
+        self._invalidate_block_cache()
+        return super(DashboardBlock, self).unlink()
+
+    def _invalidate_block_cache(self):
+        dbname = self.env.cr.dbname
+        with _block_cache_lock:
+            for key in [key for key in _block_cache if key[0] == dbname and key[1] in self.ids]:
+                del _block_cache[key]
+
+    def _get_company_key(self):
+        return ','.join(str(company_id) for company_id in sorted(self.env.companies.ids))
+
+    def _get_block_cache_key(self):
+        """ The values of a block only depend on its definition and on the
+        companies of the environment: the queries are built without record
+        rules. """
+        self.ensure_one()
+        return (self.env.cr.dbname, self.id, str(self.write_date), self.filter or '', self._get_company_key())
+
+    def _get_block_values(self):
+        """ Values of the query of the block: the axis of a chart or the
+        formatted value of a tile. """
+        self.ensure_one()
+        domain = []
+        if self.filter:
+            domain = expression.AND([literal_eval(self.filter)])
+        if self.type == 'graph':
+            query = self.env[self.model_name].get_query(domain, self.operation, self.measured_field,
+                                                        group_by=self.group_by)
+            self._cr.execute(query)
+            records = self._cr.dictfetchall()
+            x_axis = []
+            for record in records:
+                x_axis.append(record.get(self.group_by.name))
+            y_axis = []
+            for record in records:
+                y_axis.append(record.get('value'))
+            return {'x_axis': x_axis, 'y_axis': y_axis}
+        query = self.env[self.model_name].get_query(domain, self.operation, self.measured_field)
+        self._cr.execute(query)
+        records = self._cr.dictfetchall()
+        magnitude = 0
+        total = records[0].get('value')
+        while abs(total) >= 1000:
+            magnitude += 1
+            total /= 1000.0
+        # add more suffixes if you need them
+        val = '%.2f%s' % (total, ['', 'K', 'M', 'G', 'T', 'P'][magnitude])
+
+        # if rec.measured_field.ttype == 'monetary':
+            # amount = str(
+            #     value) + currency_id.symbol if currency_id.position == 'after' else currency_id.symbol + str(
+            #     value)
+        records[0]['value'] = val
+        return records[0]
+
+    def _get_block_values_threaded(self, block_id):
+        """ Compute the values of a block on its own cursor, so that the
+        blocks of a dashboard are evaluated concurrently. """
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            block = env['dashboard.block'].sudo().browse(block_id)
+            return block._get_block_values()
+
+    def _compute_blocks_values(self):
+        """ Values of the blocks of ``self``, keyed by block id. """
+        if len(self) < 2 or self.pool.in_test_mode():
+            return {block.id: block._get_block_values() for block in self}
+        max_workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odoo_dynamic_dashboard.max_workers', DASHBOARD_MAX_WORKERS))
+        if max_workers < 2:
+            return {block.id: block._get_block_values() for block in self}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(self))) as executor:
+            results = executor.map(self._get_block_values_threaded, self.ids)
+            return dict(zip(self.ids, results))
+
+    def _get_cached_blocks_values(self):
+        """ Values of the blocks of ``self`` from the result cache, the cron
+        snapshots or, for the remaining blocks, evaluated concurrently. """
+        values = {}
+        now = time.time()
+        with _block_cache_lock:
+            for block in self:
+                cached = _block_cache.get(block._get_block_cache_key())
+                if cached and cached[0] > now:
+                    values[block.id] = cached[1]
+        precomputed = self.filtered(lambda b: b.precompute and b.id not in values)
+        if precomputed:
+            snapshots = self.env['dashboard.block.snapshot'].sudo().search([
+                ('block_id', 'in', precomputed.ids),
+                ('company_key', '=', self._get_company_key()),
+            ])
+            for snapshot in snapshots:
+                values[snapshot.block_id.id] = json.loads(snapshot.values)
+        missing = self.filtered(lambda b: b.id not in values)
+        if missing:
+            start = time.time()
+            computed = missing._compute_blocks_values()
+            _logger.debug("Computed %d dashboard blocks in %.2fs", len(missing), time.time() - start)
+            values.update(computed)
+            with _block_cache_lock:
+                for key in [key for key, cached in _block_cache.items() if cached[0] <= now]:
+                    del _block_cache[key]
+                for block in missing.filtered('cache_ttl'):
+                    _block_cache[block._get_block_cache_key()] = (now + block.cache_ttl, computed[block.id])
+        return values
+
+    @api.model
+    def _cron_precompute_blocks(self):
+        """ Store a snapshot of the values of the precomputed blocks for each
+        company and for all the companies together. """
+        blocks = self.sudo().search([('precompute', '=', True), ('model_id', '!=', False)])
+        if not blocks:
+            return
+        companies = self.env['res.company'].sudo().search([])
+        company_sets = [company.ids for company in companies]
+        if len(companies) > 1:
+            company_sets.append(companies.ids)
+        Snapshot = self.env['dashboard.block.snapshot'].sudo()
+        for company_ids in company_sets:
+            env_blocks = blocks.with_context(allowed_company_ids=company_ids)
+            company_key = env_blocks._get_company_key()
+            computed = env_blocks._compute_blocks_values()
+            Snapshot.search([('block_id', 'in', blocks.ids), ('company_key', '=', company_key)]).unlink()
+            Snapshot.create([{
+                'block_id': block_id,
+                'company_key': company_key,
+                'values': json.dumps(block_values, default=json_default),
+            } for block_id, block_values in computed.items()])
 
     def get_dashboard_vals(self, action_id):
         """Dashboard block values"""
         block_id = []
         dashboard_block = self.env['dashboard.block'].sudo().search([('client_action', '=', int(action_id))])
+        blocks_values = dashboard_block.filtered('model_name')._get_cached_blocks_values()
         for rec in dashboard_block:
             color = rec.tile_color if rec.tile_color else '#1f6abb;'
             icon_color = rec.tile_color if rec.tile_color else '#1f6abb;'
@@ -90,44 +251,21 @@ class DashboardBlock(models.Model):
                 'text_color': 'color: %s;' % text_color,
                 'icon_color': 'color: %s;' % icon_color,
             }
-            domain = []
-            if rec.filter:
-                domain = expression.AND([literal_eval(rec.filter)])
             if rec.model_name:
-                if rec.type == 'graph':
-                    query = self.env[rec.model_name].get_query(domain, rec.operation, rec.measured_field,
-                                                               group_by=rec.group_by)
-                    self._cr.execute(query)
-                    records = self._cr.dictfetchall()
-                    x_axis = []
-                    for record in records:
-                        x_axis.append(record.get(rec.group_by.name))
-                    y_axis = []
-                    for record in records:
-                        y_axis.append(record.get('value'))
-                    vals.update({'x_axis': x_axis, 'y_axis': y_axis})
-                else:
-                    query = self.env[rec.model_name].get_query(domain, rec.operation, rec.measured_field)
-                    self._cr.execute(query)
-                    records = self._cr.dictfetchall()
-                    magnitude = 0
-                    total = records[0].get('value')
-                    while abs(total) >= 1000:
-                        magnitude += 1
-                        total /= 1000.0
-                    # add more suffixes if you need them
-                    val = '%.2f%s' % (total, ['', 'K', 'M', 'G', 'T', 'P'][magnitude])
-
-                    # if rec.measured_field.ttype == 'monetary':
-                        # amount = str(
-                        #     value) + currency_id.symbol if currency_id.position == 'after' else currency_id.symbol + str(
-                        #     value)
-                    records[0]['value'] = val
-                    vals.update(records[0])
+                vals.update(blocks_values[rec.id])
             block_id.append(vals)
         return block_id
 
 
+class DashboardBlockSnapshot(models.Model):
+    _name = "dashboard.block.snapshot"
+    _description = "Dashboard Block Snapshot"
+
+    block_id = fields.Many2one('dashboard.block', string="Block", required=True, ondelete='cascade', index=True)
+    company_key = fields.Char(string="Companies", required=True, index=True)
+    values = fields.Text(string="Values")
+
+
 class DashboardBlockLine(models.Model):
     _name = "dashboard.block.line"
 
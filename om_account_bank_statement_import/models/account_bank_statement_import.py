@@ -7,8 +7,6 @@ from odoo.exceptions import UserError, ValidationError
 from odoo.addons.base.models.res_bank import sanitize_account_number
 import io
 import logging
-import tempfile
-import binascii
 from datetime import datetime
 
 _logger = logging.getLogger(__name__)
@@ -51,90 +49,80 @@ class AccountBankStatementImport(models.TransientModel):
         currency = self.env['res.currency'].search([('name', '=', value)])
         return currency.id if currency else False
 
+    def _get_partner_ids(self, names):
+        """ Same as get_partner, for all the given names with one search: returns a dict {name: partner id} """
+        partner_ids = {}
+        for partner in self.env['res.partner'].search([('name', 'in', list(names))]):
+            partner_ids.setdefault(partner.name, partner.id)
+        return partner_ids
+
+    def _get_currency_ids(self, names):
+        """ Same as get_currency, for all the given names with one search: returns a dict {name: currency id} """
+        return {currency.name: currency.id for currency in self.env['res.currency'].search([('name', 'in', list(names))])}
+
     def create_statement(self, values):
         statement = self.env['account.bank.statement'].create(values)
         return statement
 
+    def _read_csv_rows(self, data_file):
+        """ Yield the rows of a csv attachment, except the header and the empty rows, as they are decoded """
+        csv_data = base64.b64decode(data_file.datas)
+        csv_reader = csv.reader(io.TextIOWrapper(io.BytesIO(csv_data), encoding='utf-8'), delimiter=',')
+        try:
+            next(csv_reader, None)
+            for row in csv_reader:
+                if row:
+                    yield list(map(str, row))
+        except (UnicodeDecodeError, csv.Error):
+            raise UserError(_("Invalid file!"))
+
+    def _read_xlsx_rows(self, data_file):
+        """ Yield the rows of the first sheet of a xlsx attachment, except the header """
+        try:
+            workbook = xlrd.open_workbook(file_contents=base64.b64decode(data_file.datas))
+            sheet = workbook.sheet_by_index(0)
+        except:
+            raise UserError(_("Invalid file!"))
+        for row_no, row in enumerate(sheet.get_rows()):
+            if row_no > 0:
+                yield [str(cell.value) for cell in row]
+
+    def _prepare_statement_lines(self, rows):
+        """ Statement lines commands of the rows of an imported file, the partners and
+        the currencies of all the rows being resolved with one search each """
+        lines = []
+        for line in rows:
+            lines.append({
+                'date': line[0],
+                'payment_ref': line[1],
+                'ref': line[2],
+                'partner_id': line[3],
+                'amount': line[4],
+                'currency_id': line[5],
+            })
+        partner_ids = self._get_partner_ids({values['partner_id'] for values in lines})
+        currency_ids = self._get_currency_ids({values['currency_id'] for values in lines})
+        for values in lines:
+            values['partner_id'] = partner_ids.get(values['partner_id'], False)
+            values['currency_id'] = currency_ids.get(values['currency_id'], False)
+        return [(0, 0, values) for values in lines]
+
     def import_file(self):
         for data_file in self.attachment_ids:
             file_name = data_file.name.lower()
             if file_name.strip().endswith('.csv') or file_name.strip().endswith('.xlsx'):
                 statement = False
                 if file_name.strip().endswith('.csv'):
-                    keys = ['date', 'payment_ref', 'partner_id', 'amount', 'currency_id']
-                    try:
-                        csv_data = base64.b64decode(data_file.datas)
-                        data_file = io.StringIO(csv_data.decode("utf-8"))
-                        data_file.seek(0)
-                        file_reader = []
-                        values = {}
-                        csv_reader = csv.reader(data_file, delimiter=',')
-                        file_reader.extend(csv_reader)
-                    except:
-                        raise UserError(_("Invalid file!"))
-                    vals_list = []
-                    date = False
-                    for i in range(len(file_reader)):
-                        field = list(map(str, file_reader[i]))
-                        values = dict(zip(keys, field))
-                        if values:
-                            if i == 0:
-                                continue
-                            else:
-                                if not date:
-                                    date = field[0]
-                                values.update({
-                                    'date': field[0],
-                                    'payment_ref': field[1],
-                                    'ref': field[2],
-                                    'partner_id': self.get_partner(field[3]),
-                                    'amount': field[4],
-                                    'currency_id':  self.get_currency(field[5])
-                                })
-                                vals_list.append((0, 0, values))
-                    statement_vals = {
-                        'name': 'Statement Of ' + str(datetime.today().date()),
-                        'journal_id': self.env.context.get('active_id'),
-                        'line_ids': vals_list
-                    }
-                    if len(vals_list) != 0:
-                        statement = self.create_statement(statement_vals)
-                elif file_name.strip().endswith('.xlsx'):
-                    try:
-                        fp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-                        fp.write(binascii.a2b_base64(data_file.datas))
-                        fp.seek(0)
-                        values = {}
-                        workbook = xlrd.open_workbook(fp.name)
-                        sheet = workbook.sheet_by_index(0)
-                    except:
-                        raise UserError(_("Invalid file!"))
-                    vals_list = []
-                    for row_no in range(sheet.nrows):
-                        val = {}
-                        values = {}
-                        if row_no <= 0:
-                            fields = map(lambda row: row.value.encode('utf-8'), sheet.row(row_no))
-                        else:
-                            line = list(map(
-                                lambda row: isinstance(row.value, bytes) and row.value.encode('utf-8') or str(
-                                    row.value), sheet.row(row_no)))
-                            values.update({
-                                'date': line[0],
-                                'payment_ref': line[1],
-                                'ref': line[2],
-                                'partner_id': self.get_partner(line[3]),
-                                'amount': line[4],
-                                'currency_id': self.get_currency(line[5])
-                            })
-                            vals_list.append((0, 0, values))
-                    statement_vals = {
-                        'name': 'Statement Of ' + str(datetime.today().date()),
-                        'journal_id': self.env.context.get('active_id'),
-                        'line_ids': vals_list
-                    }
-                    if len(vals_list) != 0:
-                        statement = self.create_statement(statement_vals)
+                    vals_list = self._prepare_statement_lines(self._read_csv_rows(data_file))
+                else:
+                    vals_list = self._prepare_statement_lines(self._read_xlsx_rows(data_file))
+                statement_vals = {
+                    'name': 'Statement Of ' + str(datetime.today().date()),
+                    'journal_id': self.env.context.get('active_id'),
+                    'line_ids': vals_list
+                }
+                if len(vals_list) != 0:
+                    statement = self.create_statement(statement_vals)
                 if statement:
                     return {
                         'type': 'ir.actions.act_window',
@@ -281,6 +269,16 @@ class AccountBankStatementImport(models.TransientModel):
         return currency, journal
 
     def _complete_stmts_vals(self, stmts_vals, journal, account_number):
+        # Find the bank accounts of all the transactions at once
+        identifying_strings = {
+            line_vals['account_number']
+            for st_vals in stmts_vals for line_vals in st_vals['transactions']
+            if not line_vals.get('bank_account_id') and line_vals.get('account_number')
+        }
+        partner_banks = {}
+        if identifying_strings:
+            for partner_bank in self.env['res.partner.bank'].search([('acc_number', 'in', list(identifying_strings))]):
+                partner_banks.setdefault(partner_bank.acc_number, partner_bank)
         for st_vals in stmts_vals:
             st_vals['journal_id'] = journal.id
             if not st_vals.get('reference'):
@@ -300,7 +298,7 @@ class AccountBankStatementImport(models.TransientModel):
                     # reconciliation process will be linked to the bank when the statement is closed.
                     identifying_string = line_vals.get('account_number')
                     if identifying_string:
-                        partner_bank = self.env['res.partner.bank'].search([('acc_number', '=', identifying_string)], limit=1)
+                        partner_bank = partner_banks.get(identifying_string)
                         if partner_bank:
                             line_vals['bank_account_id'] = partner_bank.id
                             line_vals['partner_id'] = partner_bank.partner_id.id
@@ -314,12 +312,23 @@ class AccountBankStatementImport(models.TransientModel):
         # Filter out already imported transactions and create statements
         statement_line_ids = []
         ignored_statement_lines_import_ids = []
+        import_ids = [
+            line_vals['unique_import_id']
+            for st_vals in stmts_vals for line_vals in st_vals['transactions']
+            if line_vals.get('unique_import_id')
+        ]
+        imported_ids = set()
+        if import_ids:
+            self.env.cr.execute(
+                "SELECT unique_import_id FROM account_bank_statement_line WHERE unique_import_id IN %s",
+                [tuple(import_ids)])
+            imported_ids = {row[0] for row in self.env.cr.fetchall()}
         for st_vals in stmts_vals:
             filtered_st_lines = []
             for line_vals in st_vals['transactions']:
                 if 'unique_import_id' not in line_vals \
                    or not line_vals['unique_import_id'] \
-                   or not bool(BankStatementLine.sudo().search([('unique_import_id', '=', line_vals['unique_import_id'])], limit=1)):
+                   or line_vals['unique_import_id'] not in imported_ids:
                     filtered_st_lines.append(line_vals)
                 else:
                     ignored_statement_lines_import_ids.append(line_vals['unique_import_id'])
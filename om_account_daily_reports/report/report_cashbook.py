@@ -4,11 +4,38 @@ import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+FETCH_CHUNK_SIZE = 10000
+
 
 class ReportCashBook(models.AbstractModel):
     _name = 'report.om_account_daily_reports.report_cashbook'
     _description = 'Cash Book'
 
+    def _fetch_rows_by_chunk(self, cursor_name, sql, params, chunk_size=FETCH_CHUNK_SIZE):
+        """
+        Execute the query through a server-side cursor and yield its rows
+        chunk by chunk, so that the whole result set is never loaded at
+        once by the client.
+        """
+        cr = self.env.cr
+        cr.execute('DECLARE ' + cursor_name + ' NO SCROLL CURSOR FOR ' + sql, params)
+        try:
+            while True:
+                cr.execute('FETCH %s FROM ' + cursor_name, (chunk_size,))
+                rows = cr.dictfetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cr.execute('CLOSE ' + cursor_name)
+
+    def _iter_move_lines(self, account_id, init_row, sql, params):
+        """ Lines of an account for the report: the initial balance row
+        followed by the move lines, read lazily while the report renders. """
+        if init_row:
+            yield init_row
+        yield from self._fetch_rows_by_chunk('cashbook_lines_%d' % account_id, sql, params)
+
     def _get_account_move_entry(self, accounts, init_balance, sortby, display_account):
         """
                :param:
@@ -24,12 +51,15 @@ class ReportCashBook(models.AbstractModel):
                        'credit': sum of total credit amount,
                        'balance': total balance,
                        'amount_currency': sum of amount_currency,
-                       'move_lines': list of move line
+                       'move_lines': generator of the move lines, the initial balance
+                                     first, read from a server-side cursor while
+                                     the report renders; it can only be iterated
+                                     once and has no len()
                }
                """
         cr = self.env.cr
         MoveLine = self.env['account.move.line']
-        move_lines = {x: [] for x in accounts.ids}
+        init_rows = {}
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
@@ -56,7 +86,7 @@ class ReportCashBook(models.AbstractModel):
             params = (tuple(accounts.ids),) + tuple(init_where_params)
             cr.execute(sql, params)
             for row in cr.dictfetchall():
-                move_lines[row.pop('account_id')].append(row)
+                init_rows[row.pop('account_id')] = row
 
         sql_sort = 'l.date, l.move_id'
         if sortby == 'sort_journal_partner':
@@ -76,24 +106,29 @@ class ReportCashBook(models.AbstractModel):
                 accounts.append(journal.payment_credit_account_id.id)
             accounts = self.env['account.account'].search([('id', 'in', accounts)])
 
-        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,\
-                        m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name\
-                        FROM account_move_line l\
-                        JOIN account_move m ON (l.move_id=m.id)\
-                        LEFT JOIN res_currency c ON (l.currency_id=c.id)\
-                        LEFT JOIN res_partner p ON (l.partner_id=p.id)\
-                        JOIN account_journal j ON (l.journal_id=j.id)\
-                        JOIN account_account acc ON (l.account_id = acc.id) \
-                        WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
+        from_clause = ''' FROM account_move_line l
+                        JOIN account_move m ON (l.move_id=m.id)
+                        LEFT JOIN res_currency c ON (l.currency_id=c.id)
+                        LEFT JOIN res_partner p ON (l.partner_id=p.id)
+                        JOIN account_journal j ON (l.journal_id=j.id)
+                        JOIN account_account acc ON (l.account_id = acc.id) '''
+
+        # Debit and credit of the period per account
+        sql = ('''SELECT l.account_id AS account_id,
+                        COALESCE(SUM(l.debit),0) AS debit, COALESCE(SUM(l.credit),0) AS credit'''
+               + from_clause + ''' WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.account_id''')
         params = (tuple(accounts.ids),) + tuple(where_params)
         cr.execute(sql, params)
+        period_totals = {row.pop('account_id'): row for row in cr.dictfetchall()}
 
-        for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
-            move_lines[row.pop('account_id')].append(row)
+        # Move lines of an account with their running balance, starting from
+        # the initial balance
+        lines_sql = ('''SELECT l.id AS lid, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit,
+                        %s + SUM(COALESCE(l.debit,0) - COALESCE(l.credit,0)) OVER (
+                            PARTITION BY l.account_id ORDER BY ''' + sql_sort + ''', l.id
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS balance,
+                        m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name'''
+                     + from_clause + ''' WHERE l.account_id = %s ''' + filters + ''' ORDER BY ''' + sql_sort + ''', l.id''')
 
         # Calculate the debit, credit and balance for Accounts
         account_res = []
@@ -102,14 +137,20 @@ class ReportCashBook(models.AbstractModel):
             res = dict((fn, 0.0) for fn in ['credit', 'debit', 'balance'])
             res['code'] = account.code
             res['name'] = account.name
-            res['move_lines'] = move_lines[account.id]
-            for line in res.get('move_lines'):
+            init_row = init_rows.get(account.id)
+            totals = period_totals.get(account.id)
+            opening_balance = init_row['balance'] if init_row else 0.0
+            for line in filter(None, [init_row, totals]):
                 res['debit'] += line['debit']
                 res['credit'] += line['credit']
-                res['balance'] = line['balance']
+            has_lines = bool(init_row or totals)
+            if has_lines:
+                res['balance'] = res['debit'] - res['credit']
+            res['move_lines'] = self._iter_move_lines(
+                account.id, init_row, lines_sql, (opening_balance, account.id) + tuple(where_params))
             if display_account == 'all':
                 account_res.append(res)
-            if display_account == 'movement' and res.get('move_lines'):
+            if display_account == 'movement' and has_lines:
                 account_res.append(res)
             if display_account == 'not_zero' and not currency.is_zero(res['balance']):
                 account_res.append(res)
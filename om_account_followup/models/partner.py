@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
 from functools import reduce
 from lxml import etree
 from odoo import api, fields, models, _
@@ -104,6 +105,9 @@ class ResPartner(models.Model):
         ctx['followup'] = True
         template = 'om_account_followup.email_template_om_account_followup_default'
         unknown_mails = 0
+        # contacts to email by template, their mails are rendered together
+        partners_by_template = defaultdict(lambda: self.browse())
+        messages = {}
         for partner in self:
             partners_to_email = [child for child in partner.child_ids if
                                  child.type == 'invoice' and child.email]
@@ -111,21 +115,19 @@ class ResPartner(models.Model):
                 partners_to_email = [partner]
             if partners_to_email:
                 level = partner.latest_followup_level_id_without_lit
+                if level and level.send_email and \
+                        level.email_template_id and \
+                        level.email_template_id.id:
+                    mail_template_id = level.email_template_id
+                else:
+                    mail_template_id = self.env.ref(template)
                 for partner_to_email in partners_to_email:
-                    if level and level.send_email and \
-                            level.email_template_id and \
-                            level.email_template_id.id:
-                        level.email_template_id.with_context(ctx).send_mail(
-                            partner_to_email.id)
-                    else:
-                        mail_template_id = self.env.ref(template)
-                        mail_template_id.with_context(ctx).send_mail(
-                            partner_to_email.id)
+                    partners_by_template[mail_template_id] |= partner_to_email
                 if partner not in partners_to_email:
-                    partner.message_post(body=_(
+                    messages[partner.id] = _(
                         'Overdue email sent to %s' % ', '.join(
                             ['%s <%s>' % (partner.name, partner.email) for
-                             partner in partners_to_email])))
+                             partner in partners_to_email]))
             else:
                 unknown_mails = unknown_mails + 1
                 action_text = _("Email not sent because of email address "
@@ -144,12 +146,51 @@ class ResPartner(models.Model):
                 partner.with_context(ctx).write(
                     {'payment_next_action_date': payment_action_date,
                      'payment_next_action': payment_next_action})
+        for mail_template_id, partners_to_email in partners_by_template.items():
+            partners_to_email.with_context(ctx)._queue_followup_mails(
+                mail_template_id.with_context(ctx))
+        if messages:
+            self.browse(list(messages))._message_log_batch(bodies=messages)
         return unknown_mails
 
+    def _queue_followup_mails(self, template):
+        """ Same as template.send_mail for each partner, but the mails of all the
+        partners are rendered at once and created together. They are not sent
+        here, the mail queue cron sends them. """
+        values_by_id = template.generate_email(
+            self.ids, ['subject', 'body_html', 'email_from', 'email_cc',
+                       'email_to', 'partner_to', 'reply_to', 'auto_delete',
+                       'scheduled_date'])
+        vals_list = []
+        attachments_list = []
+        for res_id in self.ids:
+            values = values_by_id[res_id]
+            values['recipient_ids'] = [
+                (4, pid) for pid in values.get('partner_ids', list())]
+            values['attachment_ids'] = [
+                (4, aid) for aid in values.get('attachment_ids', list())]
+            attachments_list.append(values.pop('attachments', []))
+            # add a protection against void email_from
+            if 'email_from' in values and not values.get('email_from'):
+                values.pop('email_from')
+            vals_list.append(values)
+        mails = self.env['mail.mail'].sudo().create(vals_list)
+        for mail, attachments in zip(mails, attachments_list):
+            if attachments:
+                attachment_ids = self.env['ir.attachment'].create([{
+                    'name': attachment[0],
+                    'datas': attachment[1],
+                    'type': 'binary',
+                    'res_model': 'mail.message',
+                    'res_id': mail.mail_message_id.id,
+                } for attachment in attachments]).ids
+                mail.write({'attachment_ids': [(4, aid) for aid in attachment_ids]})
+        return mails
+
     def get_followup_table_html(self):
         self.ensure_one()
         partner = self.commercial_partner_id
-        followup_table = ''
+        followup_table = []
         if partner.unreconciled_aml_ids:
             company = self.env.user.company_id
             current_date = fields.Date.today()
@@ -159,7 +200,7 @@ class ResPartner(models.Model):
             for currency_dict in final_res:
                 currency = currency_dict.get('line', [
                     {'currency_id': company.currency_id}])[0]['currency_id']
-                followup_table += '''
+                followup_table.append('''
                 <table border="2" width=100%%>
                 <tr>
                     <td>''' + _("Invoice Date") + '''</td>
@@ -170,34 +211,29 @@ class ResPartner(models.Model):
                     currency.symbol) + '''</td>
                     <td>''' + _("Lit.") + '''</td>
                 </tr>
-                '''
-                total = 0
+                ''')
                 for aml in currency_dict['line']:
                     block = aml['blocked'] and 'X' or ' '
-                    total += aml['balance']
                     strbegin = "<TD>"
                     strend = "</TD>"
                     date = aml['date_maturity'] or aml['date']
                     if date <= current_date and aml['balance'] > 0:
                         strbegin = "<TD><B>"
                         strend = "</B></TD>"
-                    followup_table += "<TR>" + strbegin + str(aml['date']) + \
-                                      strend + strbegin + aml['name'] + \
-                                      strend + strbegin + \
-                                      (aml['ref'] or '') + strend + \
-                                      strbegin + str(date) + strend + \
-                                      strbegin + str(aml['balance']) + \
-                                      strend + strbegin + block + \
-                                      strend + "</TR>"
+                    cells = [str(aml['date']), aml['name'], aml['ref'] or '',
+                             str(date), str(aml['balance']), block]
+                    followup_table.append(
+                        "<TR>" + "".join(strbegin + cell + strend
+                                         for cell in cells) + "</TR>")
 
                 total = reduce(lambda x, y: x + y['balance'],
                                currency_dict['line'], 0.00)
                 total = formatLang(self.env, total, currency_obj=currency)
-                followup_table += '''<tr> </tr>
+                followup_table.append('''<tr> </tr>
                                 </table>
                                 <center>''' + _(
-                    "Amount due") + ''' : %s </center>''' % (total)
-        return followup_table
+                    "Amount due") + ''' : %s </center>''' % (total))
+        return "".join(followup_table)
 
     def write(self, vals):
         if vals.get("payment_responsible_id", False):
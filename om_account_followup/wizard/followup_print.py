@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import datetime
+import logging
 import time
 from odoo import api, fields, models, _
 
+_logger = logging.getLogger(__name__)
+
 
 class FollowupPrint(models.TransientModel):
     _name = 'followup.print'
@@ -52,10 +54,13 @@ class FollowupPrint(models.TransientModel):
         nbunknownmails = 0
         nbprints = 0
         resulttext = " "
+        manual_partner_ids = []
+        mail_partners = partner_obj
+        letter_messages = {}
         for partner in self.env['followup.stat.by.partner'].browse(
                 partner_ids):
             if partner.max_followup_id.manual_action:
-                partner_obj.do_partner_manual_action([partner.partner_id.id])
+                manual_partner_ids.append(partner.partner_id.id)
                 nbmanuals = nbmanuals + 1
                 key = partner.partner_id.payment_responsible_id.name or _(
                     "Anybody")
@@ -64,7 +69,7 @@ class FollowupPrint(models.TransientModel):
                 else:
                     manuals[key] = manuals[key] + 1
             if partner.max_followup_id.send_email:
-                nbunknownmails += partner.partner_id.do_partner_mail()
+                mail_partners |= partner.partner_id
                 nbmails += 1
             if partner.max_followup_id.send_letter:
                 partner_ids_to_print.append(partner.id)
@@ -74,7 +79,18 @@ class FollowupPrint(models.TransientModel):
                 message = "%s<I> %s </I>%s" % (_("Follow-up letter of "),
                                                followup_without_lit.name,
                                                _(" will be sent"))
-                partner.partner_id.message_post(body=message)
+                letter_messages[partner.partner_id.id] = message
+        # the actions of all the partners are done at once
+        if manual_partner_ids:
+            partner_obj.do_partner_manual_action(manual_partner_ids)
+        if mail_partners:
+            nbunknownmails += mail_partners.do_partner_mail()
+        if letter_messages:
+            partner_obj.browse(list(letter_messages))._message_log_batch(
+                bodies=letter_messages)
+        _logger.info("Follow-up processed for %s partners: %s email(s), "
+                     "%s letter(s), %s manual action(s)", len(partner_ids),
+                     nbmails, nbprints, nbmanuals)
         if nbunknownmails == 0:
             resulttext += str(nbmails) + _(" email(s) sent")
         else:
@@ -101,11 +117,19 @@ class FollowupPrint(models.TransientModel):
         return result
 
     def do_update_followup_level(self, to_update, partner_list, date):
-        for id in to_update.keys():
-            if to_update[id]['partner_id'] in partner_list:
-                self.env['account.move.line'].browse([int(id)]).write(
-                    {'followup_line_id': to_update[id]['level'],
-                     'followup_date': date})
+        """ Set the new follow-up levels computed by _get_partners_followp on the
+        lines of the partners of partner_list, with one UPDATE per level. """
+        partner_set = set(partner_list)
+        for level, lines_by_partner in to_update.items():
+            line_ids = [line_id for partner_id, partner_line_ids in lines_by_partner.items()
+                        if partner_id in partner_set for line_id in partner_line_ids]
+            if line_ids:
+                self._cr.execute(
+                    """UPDATE account_move_line
+                    SET followup_line_id = %s, followup_date = %s
+                    WHERE id IN %s""", (level, date, tuple(line_ids)))
+        self.env['account.move.line'].invalidate_cache(
+            ['followup_line_id', 'followup_date'])
 
     def clear_manual_actions(self, partner_list):
         partner_list_ids = [partner.partner_id.id for partner in self.env[
@@ -162,67 +186,55 @@ class FollowupPrint(models.TransientModel):
         return self.env.user.company_id.follow_up_msg
 
     def _get_partners_followp(self):
+        """ Compute in SQL the next follow-up level of the open receivable lines:
+        a line goes to the level following its current one (the first level when
+        it has none) once its due date (or its date) is older than the delay of
+        that level.
+
+        :return: {'partner_ids': ids of the followup.stat.by.partner to process,
+                  'to_update': {level id: {followup.stat.by.partner id: [line ids]}}}
+        """
         data = self
         company_id = data.company_id.id
         context = self.env.context
+        fup_id = 'followup_id' in context and context[
+            'followup_id'] or data.followup_id.id
+        date = 'date' in context and context['date'] or data.date
+        date = fields.Date.to_date(date)
+        self.env['account.move.line'].flush(
+            ['partner_id', 'followup_line_id', 'date_maturity', 'date',
+             'full_reconcile_id', 'debit', 'company_id', 'blocked',
+             'account_id'])
         self._cr.execute(
-            '''SELECT
-                    l.partner_id,
-                    l.followup_line_id,
-                    l.date_maturity,
-                    l.date, l.id
+            '''WITH levels AS (
+                    SELECT id, delay,
+                        LAG(id) OVER (ORDER BY delay) AS previous_id
+                    FROM followup_line
+                    WHERE followup_id = %(followup_id)s
+                )
+                SELECT
+                    levels.id,
+                    l.partner_id * 10000 + l.company_id,
+                    ARRAY_AGG(l.id)
                 FROM account_move_line AS l
                 LEFT JOIN account_account AS a
                 ON (l.account_id=a.id)
+                JOIN levels
+                ON (levels.previous_id IS NOT DISTINCT FROM l.followup_line_id)
                 WHERE (l.full_reconcile_id IS NULL)
                 AND a.user_type_id IN (SELECT id FROM account_account_type
                     WHERE type = 'receivable')
                 AND (l.partner_id is NOT NULL)
                 AND (l.debit > 0)
-                AND (l.company_id = %s)
+                AND (l.company_id = %(company_id)s)
                 AND (l.blocked = False)
-                ORDER BY l.date''' % (company_id))
-        move_lines = self._cr.fetchall()
-        old = None
-        fups = {}
-        fup_id = 'followup_id' in context and context[
-            'followup_id'] or data.followup_id.id
-        date = 'date' in context and context['date'] or data.date
-        date = fields.Date.to_string(date)
-        current_date = datetime.date(*time.strptime(date, '%Y-%m-%d')[:3])
-        self._cr.execute(
-            '''SELECT *
-            FROM followup_line
-            WHERE followup_id=%s
-            ORDER BY delay''' % (fup_id,))
+                AND COALESCE(l.date_maturity, l.date) <= %(date)s::date - levels.delay
+                GROUP BY levels.id, l.partner_id, l.company_id''',
+            {'followup_id': fup_id, 'company_id': company_id, 'date': date})
 
-        for result in self._cr.dictfetchall():
-            delay = datetime.timedelta(days=result['delay'])
-            fups[old] = (current_date - delay, result['id'])
-            old = result['id']
-
-        partner_list = []
+        partner_set = set()
         to_update = {}
-
-        for partner_id, followup_line_id, date_maturity, date, id in \
-                move_lines:
-            if not partner_id:
-                continue
-            if followup_line_id not in fups:
-                continue
-            stat_line_id = partner_id * 10000 + company_id
-            if date_maturity:
-                date_maturity = fields.Date.to_string(date_maturity)
-                if date_maturity <= fups[followup_line_id][0].strftime(
-                        '%Y-%m-%d'):
-                    if stat_line_id not in partner_list:
-                        partner_list.append(stat_line_id)
-                    to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                          'partner_id': stat_line_id}
-            elif date and date <= fups[followup_line_id][0].strftime(
-                    '%Y-%m-%d'):
-                if stat_line_id not in partner_list:
-                    partner_list.append(stat_line_id)
-                to_update[str(id)] = {'level': fups[followup_line_id][1],
-                                      'partner_id': stat_line_id}
-        return {'partner_ids': partner_list, 'to_update': to_update}
+        for level, stat_line_id, line_ids in self._cr.fetchall():
+            partner_set.add(stat_line_id)
+            to_update.setdefault(level, {})[stat_line_id] = line_ids
+        return {'partner_ids': sorted(partner_set), 'to_update': to_update}
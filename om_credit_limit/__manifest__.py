@@ -2,7 +2,7 @@
     'name': 'Odoo 15 Credit Limit',
     'author': 'Odoo Mates',
     'category': 'Accounting',
-    'version': '2.0.0',
+    'version': '2.1.0',
     'description': """Customer Credit Limit""",
     'summary': """Customer Credit Limit""",
     'sequence': 11,
@@ -10,6 +10,8 @@
     'depends': ['account', 'sale'],
     'license': 'LGPL-3',
     'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/res_partner.xml',
         'views/account_move.xml',
         'views/sale_order.xml',
@@ -3,3 +3,4 @@ from . import res_company
 from . import account_move
 from . import sale_order
 from . import res_config_settings
+from . import res_partner_credit_exposure
@@ -4,10 +4,17 @@ from odoo import models, fields, api, _
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
-    partner_credit = fields.Monetary(related='partner_id.commercial_partner_id.credit', readonly=True)
+    partner_credit = fields.Monetary(compute='_compute_partner_credit')
     partner_credit_limit = fields.Monetary(related='partner_id.credit_limit_compute', readonly=True)
     show_partner_credit_warning = fields.Boolean(compute='_compute_show_partner_credit_warning')
 
+    @api.depends('partner_id', 'company_id')
+    def _compute_partner_credit(self):
+        exposure = self.env['res.partner.credit.exposure']._get_exposure(self.partner_id, self.company_id)
+        for move in self:
+            key = (move.partner_id.commercial_partner_id.id, move.company_id.id)
+            move.partner_credit = exposure.get(key, 0.0)
+
     @api.depends('partner_credit_limit', 'partner_credit',
                  'company_id.account_default_credit_limit', 'company_id.account_credit_limit')
     def _compute_show_partner_credit_warning(self):
@@ -19,4 +26,59 @@ class AccountMove(models.Model):
                                                ((company_limit and move.partner_credit > company_limit) or \
                                                (partner_limit and move.partner_credit > partner_limit))
 
+    def _get_credit_exposure_partners(self):
+        return self.line_ids.partner_id.commercial_partner_id | self.partner_id.commercial_partner_id
+
+    def _refresh_credit_exposure(self):
+        partners = self._get_credit_exposure_partners()
+        Exposure = self.env['res.partner.credit.exposure'].sudo()
+        Exposure._refresh_receivable(partners)
+        # the invoiced quantities of the sale orders follow the invoices
+        Exposure._refresh_uninvoiced(partners)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super(AccountMove, self).create(vals_list)
+        invoices = moves.filtered(lambda m: m.move_type in ('out_invoice', 'out_refund'))
+        self.env['res.partner.credit.exposure'].sudo()._refresh_uninvoiced(invoices.partner_id.commercial_partner_id)
+        return moves
+
+    def unlink(self):
+        partners = self.filtered(lambda m: m.move_type in ('out_invoice', 'out_refund')).partner_id.commercial_partner_id
+        res = super(AccountMove, self).unlink()
+        self.env['res.partner.credit.exposure'].sudo()._refresh_uninvoiced(partners)
+        return res
+
+    def _post(self, soft=True):
+        posted = super(AccountMove, self)._post(soft=soft)
+        posted._refresh_credit_exposure()
+        return posted
+
+    def button_draft(self):
+        res = super(AccountMove, self).button_draft()
+        self._refresh_credit_exposure()
+        return res
+
+    def button_cancel(self):
+        res = super(AccountMove, self).button_cancel()
+        self._refresh_credit_exposure()
+        return res
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    def _get_credit_exposure_partners(self):
+        return (self.debit_move_id.partner_id | self.credit_move_id.partner_id).commercial_partner_id
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super(AccountPartialReconcile, self).create(vals_list)
+        self.env['res.partner.credit.exposure'].sudo()._refresh_receivable(partials._get_credit_exposure_partners())
+        return partials
 
+    def unlink(self):
+        partners = self._get_credit_exposure_partners()
+        res = super(AccountPartialReconcile, self).unlink()
+        self.env['res.partner.credit.exposure'].sudo()._refresh_receivable(partners)
+        return res
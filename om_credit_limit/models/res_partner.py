@@ -11,6 +11,15 @@ class ResPartner(models.Model):
         help='A limit of zero means no limit. A limit of -1 will use the default (company) limit.'
     )
     show_credit_limit = fields.Boolean(compute='_compute_show_credit_limit')
+    credit_exposure = fields.Monetary(
+        string='Credit Exposure', compute='_compute_credit_exposure',
+        help='Total receivable plus the amount of the confirmed sale orders not invoiced yet.')
+
+    @api.depends_context('company')
+    def _compute_credit_exposure(self):
+        exposure = self.env['res.partner.credit.exposure']._get_exposure(self, self.env.company)
+        for partner in self:
+            partner.credit_exposure = exposure.get((partner.commercial_partner_id.id, self.env.company.id), 0.0)
 
     @api.depends('amount_credit_limit')
     @api.depends_context('company')
@@ -0,0 +1,131 @@
+from odoo import models, fields, api
+
+
+class ResPartnerCreditExposure(models.Model):
+    _name = 'res.partner.credit.exposure'
+    _description = 'Partner Credit Exposure'
+    _log_access = False
+
+    partner_id = fields.Many2one('res.partner', string='Commercial Partner', required=True, readonly=True,
+                                 ondelete='cascade')
+    company_id = fields.Many2one('res.company', required=True, readonly=True, ondelete='cascade')
+    receivable_amount = fields.Float(string='Receivable', readonly=True,
+                                     help='Residual amount of the posted receivable lines.')
+    uninvoiced_amount = fields.Float(string='Uninvoiced', readonly=True,
+                                     help='Amount of the confirmed sale orders not invoiced yet.')
+
+    _sql_constraints = [
+        ('partner_company_uniq', 'unique(partner_id, company_id)', 'The credit exposure must be unique per company!'),
+    ]
+
+    def init(self):
+        self._cr.execute("SELECT 1 FROM res_partner_credit_exposure LIMIT 1")
+        if not self._cr.fetchone():
+            self._refresh_receivable()
+            self._refresh_uninvoiced()
+
+    @api.model
+    def _refresh_receivable(self, partners=None):
+        """ Recompute the receivable amount of the given commercial partners,
+        or of all of them. """
+        if partners is not None and not partners:
+            return
+        self.flush()
+        where, params = '', []
+        if partners is not None:
+            where = 'AND rp.commercial_partner_id IN %s'
+            params = [tuple(partners.ids)]
+            self._cr.execute("""
+                UPDATE res_partner_credit_exposure SET receivable_amount = 0
+                 WHERE partner_id IN %s
+            """, params)
+        else:
+            self._cr.execute("UPDATE res_partner_credit_exposure SET receivable_amount = 0")
+        self._cr.execute("""
+            INSERT INTO res_partner_credit_exposure (partner_id, company_id, receivable_amount, uninvoiced_amount)
+            SELECT rp.commercial_partner_id, l.company_id, SUM(l.amount_residual), 0
+              FROM account_move_line l
+              JOIN account_account a ON a.id = l.account_id
+              JOIN res_partner rp ON rp.id = l.partner_id
+             WHERE a.internal_type = 'receivable'
+               AND l.parent_state = 'posted'
+               AND NOT l.reconciled
+               {where}
+             GROUP BY rp.commercial_partner_id, l.company_id
+                ON CONFLICT (partner_id, company_id)
+                DO UPDATE SET receivable_amount = EXCLUDED.receivable_amount
+        """.format(where=where), params)
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh_uninvoiced(self, partners=None):
+        """ Recompute the amount of the confirmed sale orders that is not
+        invoiced yet for the given commercial partners, or all of them.
+
+        Only the posted invoices and refunds count as invoiced, so that the
+        draft invoices stay part of the exposure until they are posted. """
+        if partners is not None and not partners:
+            return
+        self.flush()
+        self.env['account.move.line'].flush(['quantity', 'product_uom_id', 'parent_state', 'move_id'])
+        self.env['account.move'].flush(['move_type'])
+        where, params = '', []
+        if partners is not None:
+            where = 'AND rp.commercial_partner_id IN %s'
+            params = [tuple(partners.ids)]
+            self._cr.execute("""
+                UPDATE res_partner_credit_exposure SET uninvoiced_amount = 0
+                 WHERE partner_id IN %s
+            """, params)
+        else:
+            self._cr.execute("UPDATE res_partner_credit_exposure SET uninvoiced_amount = 0")
+        self._cr.execute("""
+            INSERT INTO res_partner_credit_exposure (partner_id, company_id, receivable_amount, uninvoiced_amount)
+            SELECT rp.commercial_partner_id, so.company_id, 0,
+                   SUM((sl.product_uom_qty - invoiced.qty) / sl.product_uom_qty * sl.price_total
+                       / COALESCE(NULLIF(so.currency_rate, 0), 1.0))
+              FROM sale_order_line sl
+              JOIN sale_order so ON so.id = sl.order_id
+              JOIN res_partner rp ON rp.id = so.partner_id
+              LEFT JOIN uom_uom line_uom ON line_uom.id = sl.product_uom
+              CROSS JOIN LATERAL (
+                    SELECT COALESCE(SUM(
+                               CASE WHEN am.move_type = 'out_refund' THEN -aml.quantity ELSE aml.quantity END
+                               / COALESCE(NULLIF(aml_uom.factor, 0), 1.0) * COALESCE(line_uom.factor, 1.0)
+                           ), 0.0) AS qty
+                      FROM sale_order_line_invoice_rel rel
+                      JOIN account_move_line aml ON aml.id = rel.invoice_line_id
+                      JOIN account_move am ON am.id = aml.move_id
+                      LEFT JOIN uom_uom aml_uom ON aml_uom.id = aml.product_uom_id
+                     WHERE rel.order_line_id = sl.id
+                       AND aml.parent_state = 'posted'
+                       AND am.move_type IN ('out_invoice', 'out_refund')
+              ) AS invoiced
+             WHERE so.state IN ('sale', 'done')
+               AND sl.product_uom_qty > 0
+               AND sl.product_uom_qty > invoiced.qty
+               {where}
+             GROUP BY rp.commercial_partner_id, so.company_id
+                ON CONFLICT (partner_id, company_id)
+                DO UPDATE SET uninvoiced_amount = EXCLUDED.uninvoiced_amount
+        """.format(where=where), params)
+        self.invalidate_cache()
+
+    @api.model
+    def _get_exposure(self, partners, companies):
+        """ Credit exposure, receivable plus uninvoiced amount, keyed by
+        (commercial partner id, company id). """
+        partner_ids = tuple(partners.commercial_partner_id.ids)
+        if not partner_ids or not companies:
+            return {}
+        self._cr.execute("""
+            SELECT partner_id, company_id, receivable_amount + uninvoiced_amount
+              FROM res_partner_credit_exposure
+             WHERE partner_id IN %s AND company_id IN %s
+        """, [partner_ids, tuple(companies.ids)])
+        return {(partner_id, company_id): amount for partner_id, company_id, amount in self._cr.fetchall()}
+
+    @api.model
+    def _cron_rebuild_exposure(self):
+        self._refresh_receivable()
+        self._refresh_uninvoiced()
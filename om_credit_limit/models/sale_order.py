@@ -1,13 +1,23 @@
 from odoo import models, fields, api, _
 
+CREDIT_EXPOSURE_ORDER_FIELDS = {'state', 'partner_id', 'company_id', 'currency_rate'}
+CREDIT_EXPOSURE_LINE_FIELDS = {'product_uom_qty', 'price_unit', 'discount', 'tax_id'}
+
 
 class SaleOrder(models.Model):
     _inherit = 'sale.order'
 
-    partner_credit = fields.Monetary(related='partner_id.commercial_partner_id.credit', readonly=True)
+    partner_credit = fields.Monetary(compute='_compute_partner_credit')
     partner_credit_limit = fields.Monetary(related='partner_id.credit_limit_compute', readonly=True)
     show_partner_credit_warning = fields.Boolean(compute='_compute_show_partner_credit_warning')
 
+    @api.depends('partner_id', 'company_id')
+    def _compute_partner_credit(self):
+        exposure = self.env['res.partner.credit.exposure']._get_exposure(self.partner_id, self.company_id)
+        for order in self:
+            key = (order.partner_id.commercial_partner_id.id, order.company_id.id)
+            order.partner_credit = exposure.get(key, 0.0)
+
     @api.depends('partner_credit_limit', 'partner_credit',
                  'company_id.account_default_credit_limit', 'company_id.account_credit_limit')
     def _compute_show_partner_credit_warning(self):
@@ -19,4 +29,34 @@ class SaleOrder(models.Model):
                                                 ((company_limit and order.partner_credit > company_limit) or \
                                                 (partner_limit and order.partner_credit > partner_limit))
 
+    def _get_credit_exposure_partners(self):
+        return self.filtered(lambda o: o.state in ('sale', 'done')).partner_id.commercial_partner_id
+
+    def write(self, vals):
+        if not CREDIT_EXPOSURE_ORDER_FIELDS.intersection(vals):
+            return super(SaleOrder, self).write(vals)
+        partners = self._get_credit_exposure_partners()
+        res = super(SaleOrder, self).write(vals)
+        partners |= self._get_credit_exposure_partners()
+        self.env['res.partner.credit.exposure'].sudo()._refresh_uninvoiced(partners)
+        return res
+
+
+class SaleOrderLine(models.Model):
+    _inherit = 'sale.order.line'
+
+    def _refresh_credit_exposure(self):
+        partners = self.order_id._get_credit_exposure_partners()
+        self.env['res.partner.credit.exposure'].sudo()._refresh_uninvoiced(partners)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(SaleOrderLine, self).create(vals_list)
+        lines._refresh_credit_exposure()
+        return lines
 
+    def write(self, vals):
+        res = super(SaleOrderLine, self).write(vals)
+        if CREDIT_EXPOSURE_LINE_FIELDS.intersection(vals):
+            self._refresh_credit_exposure()
+        return res
@@ -1,6 +1,7 @@
 # -*- coding:utf-8 -*-
 
 import babel
+from collections import defaultdict
 from datetime import date, datetime, time
 from dateutil.relativedelta import relativedelta
 from pytz import timezone
@@ -8,6 +9,77 @@ from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError, ValidationError
 
 
+class PayslipHistory(object):
+    """
+    Done payslips of a set of employees since window_start, grouped by employee, code and period.
+    It answers the sums asked by the salary rules (inputs.sum, worked_days.sum, payslip.sum) from
+    memory, with one query per table for the whole set of employees.
+    """
+    def __init__(self, env, employee_ids, window_start):
+        self.employee_ids = set(employee_ids)
+        self.window_start = window_start
+        self.inputs = defaultdict(list)
+        self.worked_days = defaultdict(list)
+        self.lines = defaultdict(list)
+        if not self.employee_ids:
+            return
+        params = (tuple(self.employee_ids), window_start)
+        env.cr.execute("""
+            SELECT hp.employee_id, pi.code, hp.date_from, hp.date_to, sum(pi.amount)
+            FROM hr_payslip as hp, hr_payslip_input as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pi.payslip_id
+            GROUP BY hp.employee_id, pi.code, hp.date_from, hp.date_to""", params)
+        for employee_id, code, date_from, date_to, amount in env.cr.fetchall():
+            self.inputs[(employee_id, code)].append((date_from, date_to, (amount,)))
+        env.cr.execute("""
+            SELECT hp.employee_id, pi.code, hp.date_from, hp.date_to, sum(number_of_days), sum(number_of_hours)
+            FROM hr_payslip as hp, hr_payslip_worked_days as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pi.payslip_id
+            GROUP BY hp.employee_id, pi.code, hp.date_from, hp.date_to""", params)
+        for employee_id, code, date_from, date_to, days, hours in env.cr.fetchall():
+            self.worked_days[(employee_id, code)].append((date_from, date_to, (days, hours)))
+        env.cr.execute("""
+            SELECT hp.employee_id, pl.code, hp.date_from, hp.date_to,
+                   sum(case when hp.credit_note = False then (pl.total) else (-pl.total) end)
+            FROM hr_payslip as hp, hr_payslip_line as pl
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pl.slip_id
+            GROUP BY hp.employee_id, pl.code, hp.date_from, hp.date_to""", params)
+        for employee_id, code, date_from, date_to, total in env.cr.fetchall():
+            self.lines[(employee_id, code)].append((date_from, date_to, (total,)))
+
+    def _sum(self, grouped, employee_id, code, from_date, to_date, size):
+        """
+        @return: returns a tuple of size sums (None when nothing matches, like SQL does), or None
+                 when the history can't answer and the caller has to query the database
+        """
+        try:
+            from_date = fields.Date.to_date(from_date)
+            to_date = fields.Date.to_date(to_date)
+        except (TypeError, ValueError):
+            return None
+        if employee_id not in self.employee_ids or not from_date or not to_date or from_date < self.window_start:
+            return None
+        res = [None] * size
+        for date_from, date_to, values in grouped.get((employee_id, code), []):
+            if date_from >= from_date and date_to <= to_date:
+                for index, value in enumerate(values):
+                    if value is not None:
+                        res[index] = (res[index] or 0.0) + value
+        return tuple(res)
+
+    def sum_inputs(self, employee_id, code, from_date, to_date):
+        return self._sum(self.inputs, employee_id, code, from_date, to_date, 1)
+
+    def sum_worked_days(self, employee_id, code, from_date, to_date):
+        return self._sum(self.worked_days, employee_id, code, from_date, to_date, 2)
+
+    def sum_lines(self, employee_id, code, from_date, to_date):
+        return self._sum(self.lines, employee_id, code, from_date, to_date, 1)
+
+
 class HrPayslip(models.Model):
     _name = 'hr.payslip'
     _description = 'Pay Slip'
@@ -157,16 +229,41 @@ class HrPayslip(models.Model):
         @param date_to: date field
         @return: returns the ids of all the contracts for the given employee that need to be considered for the given dates
         """
+        return self.env['hr.contract'].search(self._get_contract_domain(employee, date_from, date_to)).ids
+
+    @api.model
+    def _get_contract_domain(self, employees, date_from, date_to):
         # a contract is valid if it ends between the given dates
         clause_1 = ['&', ('date_end', '<=', date_to), ('date_end', '>=', date_from)]
         # OR if it starts between the given dates
         clause_2 = ['&', ('date_start', '<=', date_to), ('date_start', '>=', date_from)]
         # OR if it starts before the date_from and finish after the date_end (or never finish)
         clause_3 = ['&', ('date_start', '<=', date_from), '|', ('date_end', '=', False), ('date_end', '>=', date_to)]
-        clause_final = [('employee_id', '=', employee.id), ('state', '=', 'open'), '|', '|'] + clause_1 + clause_2 + clause_3
-        return self.env['hr.contract'].search(clause_final).ids
+        return [('employee_id', 'in', employees.ids), ('state', '=', 'open'), '|', '|'] + clause_1 + clause_2 + clause_3
+
+    @api.model
+    def get_contracts_by_employee(self, employees, date_from, date_to):
+        """
+        @param employees: recordset of employees
+        @return: returns a dict {employee id: ids of the contracts to consider}, like get_contract, with one search
+        """
+        res = defaultdict(list)
+        for contract in self.env['hr.contract'].search(self._get_contract_domain(employees, date_from, date_to)):
+            res[contract.employee_id.id].append(contract.id)
+        return res
+
+    def _get_payslip_history(self):
+        """
+        @return: returns the history of the employees of the payslips, loaded from the start of the
+                 year before the earliest payslip so that yearly and rolling twelve months sums
+                 don't have to hit the database
+        """
+        dates = [date_from for date_from in self.mapped('date_from') if date_from]
+        window_start = date(min(dates).year - 1, 1, 1) if dates else date(fields.Date.today().year - 1, 1, 1)
+        return PayslipHistory(self.env, self.mapped('employee_id').ids, window_start)
 
     def compute_sheet(self):
+        history = self._get_payslip_history()
         for payslip in self:
             number = payslip.number or self.env['ir.sequence'].next_by_code('salary.slip')
             # delete old payslip lines
@@ -177,7 +274,7 @@ class HrPayslip(models.Model):
                 self.get_contract(payslip.employee_id, payslip.date_from, payslip.date_to)
             if not contract_ids:
                 raise ValidationError(_("No running contract found for the employee: %s or no contract in the given period" % payslip.employee_id.name))
-            lines = [(0, 0, line) for line in self._get_payslip_lines(contract_ids, payslip.id)]
+            lines = [(0, 0, line) for line in self._get_payslip_lines(contract_ids, payslip.id, history=history)]
             payslip.write({'line_ids': lines, 'number': number})
         return True
 
@@ -188,11 +285,25 @@ class HrPayslip(models.Model):
         @return: returns a list of dict containing the input that should be applied for the given contract between date_from and date_to
         """
         res = []
+        day_from = datetime.combine(fields.Date.from_string(date_from), time.min)
+        day_to = datetime.combine(fields.Date.from_string(date_to), time.max)
         # fill only if the contract as a working schedule linked
-        for contract in contracts.filtered(lambda contract: contract.resource_calendar_id):
-            day_from = datetime.combine(fields.Date.from_string(date_from), time.min)
-            day_to = datetime.combine(fields.Date.from_string(date_to), time.max)
+        contracts = contracts.filtered(lambda contract: contract.resource_calendar_id)
 
+        # compute worked days of the employees sharing a working schedule at once
+        work_data_by_calendar = {}
+        for calendar in contracts.mapped('resource_calendar_id'):
+            employees = contracts.filtered(lambda contract: contract.resource_calendar_id == calendar).mapped('employee_id')
+            work_data_by_calendar[calendar] = employees._get_work_days_data_by_record(
+                day_from,
+                day_to,
+                calendar=calendar,
+                compute_leaves=False,
+            )
+        # the work hours of a day only depend on the working schedule
+        work_hours_by_day = {}
+
+        for contract in contracts:
             # compute leave days
             leaves = {}
             calendar = contract.resource_calendar_id
@@ -209,21 +320,17 @@ class HrPayslip(models.Model):
                     'contract_id': contract.id,
                 })
                 current_leave_struct['number_of_hours'] -= hours
-                work_hours = calendar.get_work_hours_count(
-                    tz.localize(datetime.combine(day, time.min)),
-                    tz.localize(datetime.combine(day, time.max)),
-                    compute_leaves=False,
-                )
+                if (calendar, day) not in work_hours_by_day:
+                    work_hours_by_day[(calendar, day)] = calendar.get_work_hours_count(
+                        tz.localize(datetime.combine(day, time.min)),
+                        tz.localize(datetime.combine(day, time.max)),
+                        compute_leaves=False,
+                    )
+                work_hours = work_hours_by_day[(calendar, day)]
                 if work_hours:
                     current_leave_struct['number_of_days'] -= hours / work_hours
 
-            # compute worked days
-            work_data = contract.employee_id._get_work_days_data(
-                day_from,
-                day_to,
-                calendar=contract.resource_calendar_id,
-                compute_leaves=False,
-            )
+            work_data = work_data_by_calendar[calendar][contract.employee_id.id]
             attendances = {
                 'name': _("Normal Working Days paid at 100%"),
                 'sequence': 1,
@@ -257,7 +364,7 @@ class HrPayslip(models.Model):
         return res
 
     @api.model
-    def _get_payslip_lines(self, contract_ids, payslip_id):
+    def _get_payslip_lines(self, contract_ids, payslip_id, history=None):
         def _sum_salary_rule_category(localdict, category, amount):
             if category.parent_id:
                 localdict = _sum_salary_rule_category(localdict, category.parent_id, amount)
@@ -278,6 +385,9 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = history and history.sum_inputs(self.employee_id, code, from_date, to_date)
+                if res is not None:
+                    return res[0] or 0.0
                 self.env.cr.execute("""
                     SELECT sum(amount) as sum
                     FROM hr_payslip as hp, hr_payslip_input as pi
@@ -291,6 +401,9 @@ class HrPayslip(models.Model):
             def _sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = history and history.sum_worked_days(self.employee_id, code, from_date, to_date)
+                if res is not None:
+                    return res
                 self.env.cr.execute("""
                     SELECT sum(number_of_days) as number_of_days, sum(number_of_hours) as number_of_hours
                     FROM hr_payslip as hp, hr_payslip_worked_days as pi
@@ -313,6 +426,9 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = history and history.sum_lines(self.employee_id, code, from_date, to_date)
+                if res is not None:
+                    return res[0] or 0.0
                 self.env.cr.execute("""SELECT sum(case when hp.credit_note = False then (pl.total) else (-pl.total) end)
                             FROM hr_payslip as hp, hr_payslip_line as pl
                             WHERE hp.employee_id = %s AND hp.state = 'done'
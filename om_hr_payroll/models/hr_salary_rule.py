@@ -1,8 +1,8 @@
 # -*- coding:utf-8 -*-
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError, ValidationError
-from odoo.tools.safe_eval import safe_eval
+from odoo.tools.safe_eval import test_expr, unsafe_eval, _BUILTINS, _SAFE_OPCODES
 
 
 class HrPayrollStructure(models.Model):
@@ -164,11 +164,37 @@ class HrSalaryRule(models.Model):
     input_ids = fields.One2many('hr.rule.input', 'input_id', string='Inputs', copy=True)
     note = fields.Text(string='Description')
 
+    # fields holding python expressions evaluated while computing a payslip
+    _python_code_fields = ['quantity', 'amount_percentage_base', 'amount_python_compute', 'condition_range', 'condition_python']
+
     @api.constrains('parent_rule_id')
     def _check_parent_rule_id(self):
         if not self._check_recursion(parent='parent_rule_id'):
             raise ValidationError(_('Error! You cannot create recursive hierarchy of Salary Rules.'))
 
+    def write(self, vals):
+        if any(fname in vals for fname in self._python_code_fields):
+            self.clear_caches()
+        return super(HrSalaryRule, self).write(vals)
+
+    @tools.ormcache('self.id', 'self.write_date', 'fname', 'mode')
+    def _get_compiled_code(self, fname, mode):
+        """
+        @return: returns the code object of the expression stored in fname, checked against the
+                 opcodes allowed by safe_eval, so it is parsed once per rule instead of once per payslip
+        """
+        return test_expr(self[fname], _SAFE_OPCODES, mode=mode)
+
+    def _eval_code(self, fname, localdict, mode='eval'):
+        """
+        Evaluate the expression stored in fname in localdict, in the same sandbox as safe_eval.
+        In 'exec' mode, localdict is updated in place (like safe_eval with nocopy=True).
+        """
+        self.ensure_one()
+        code = self._get_compiled_code(fname, mode)
+        localdict['__builtins__'] = _BUILTINS
+        return unsafe_eval(code, localdict)
+
     def _recursive_search_of_rules(self):
         """
         @return: returns a list of tuple (id, sequence) which are all the children of the passed rule_ids
@@ -188,19 +214,19 @@ class HrSalaryRule(models.Model):
         self.ensure_one()
         if self.amount_select == 'fix':
             try:
-                return self.amount_fix, float(safe_eval(self.quantity, localdict)), 100.0
+                return self.amount_fix, float(self._eval_code('quantity', localdict)), 100.0
             except:
                 raise UserError(_('Wrong quantity defined for salary rule %s (%s).') % (self.name, self.code))
         elif self.amount_select == 'percentage':
             try:
-                return (float(safe_eval(self.amount_percentage_base, localdict)),
-                        float(safe_eval(self.quantity, localdict)),
+                return (float(self._eval_code('amount_percentage_base', localdict)),
+                        float(self._eval_code('quantity', localdict)),
                         self.amount_percentage)
             except:
                 raise UserError(_('Wrong percentage base or quantity defined for salary rule %s (%s).') % (self.name, self.code))
         else:
             try:
-                safe_eval(self.amount_python_compute, localdict, mode='exec', nocopy=True)
+                self._eval_code('amount_python_compute', localdict, mode='exec')
                 return float(localdict['result']), 'result_qty' in localdict and localdict['result_qty'] or 1.0, 'result_rate' in localdict and localdict['result_rate'] or 100.0
             except Exception as ex:
                 raise UserError(_(
@@ -222,13 +248,13 @@ class HrSalaryRule(models.Model):
             return True
         elif self.condition_select == 'range':
             try:
-                result = safe_eval(self.condition_range, localdict)
+                result = self._eval_code('condition_range', localdict)
                 return self.condition_range_min <= result and result <= self.condition_range_max or False
             except:
                 raise UserError(_('Wrong range condition defined for salary rule %s (%s).') % (self.name, self.code))
         else:  # python code
             try:
-                safe_eval(self.condition_python, localdict, mode='exec', nocopy=True)
+                self._eval_code('condition_python', localdict, mode='exec')
                 return 'result' in localdict and localdict['result'] or False
             except Exception as ex:
                 raise UserError(_(
@@ -23,39 +23,56 @@ class ResourceMixin(models.AbstractModel):
             Returns a dict {'days': n, 'hours': h} containing the
             quantity of working time expressed as days and as hours.
         """
-        resource = self.resource_id
-        calendar = calendar or self.resource_calendar_id
+        self.ensure_one()
+        return self._get_work_days_data_by_record(
+            from_datetime, to_datetime, compute_leaves=compute_leaves, calendar=calendar, domain=domain)[self.id]
 
+    def _get_work_days_data_by_record(self, from_datetime, to_datetime, compute_leaves=True, calendar=None, domain=None):
+        """
+            Same as `_get_work_days_data`, for all the records at once:
+            the intervals are computed with one call per calendar.
+
+            Returns a dict {record id: {'days': n, 'hours': h}}.
+        """
         # naive datetimes are made explicit in UTC
         if not from_datetime.tzinfo:
             from_datetime = from_datetime.replace(tzinfo=utc)
         if not to_datetime.tzinfo:
             to_datetime = to_datetime.replace(tzinfo=utc)
 
+        records_by_calendar = defaultdict(lambda: self.browse())
+        for record in self:
+            records_by_calendar[calendar or record.resource_calendar_id] |= record
+
         # total hours per day: retrieve attendances with one extra day margin,
         # in order to compute the total hours on the first and last days
         from_full = from_datetime - timedelta(days=1)
         to_full = to_datetime + timedelta(days=1)
-        intervals = calendar._attendance_intervals_batch(from_full, to_full, resource)
-        day_total = defaultdict(float)
-        for start, stop, meta in intervals[resource.id]:
-            day_total[start.date()] += (stop - start).total_seconds() / 3600
-
-        # actual hours per day
-        if compute_leaves:
-            intervals = calendar._work_intervals_batch(from_datetime, to_datetime, resource, domain)
-        else:
-            intervals = calendar._attendance_intervals_batch(from_datetime, to_datetime, resource)
-        day_hours = defaultdict(float)
-        for start, stop, meta in intervals[resource.id]:
-            day_hours[start.date()] += (stop - start).total_seconds() / 3600
-
-        # compute number of days as quarters
-        days = sum(
-            float_utils.round(ROUNDING_FACTOR * day_hours[day] / day_total[day]) / ROUNDING_FACTOR
-            for day in day_hours
-        )
-        return {
-            'days': days,
-            'hours': sum(day_hours.values()),
-        }
+        result = {}
+        for record_calendar, records in records_by_calendar.items():
+            resources = records.mapped('resource_id')
+            total_intervals = record_calendar._attendance_intervals_batch(from_full, to_full, resources)
+            # actual hours per day
+            if compute_leaves:
+                intervals = record_calendar._work_intervals_batch(from_datetime, to_datetime, resources, domain)
+            else:
+                intervals = record_calendar._attendance_intervals_batch(from_datetime, to_datetime, resources)
+            for record in records:
+                resource = record.resource_id
+                day_total = defaultdict(float)
+                for start, stop, meta in total_intervals[resource.id]:
+                    day_total[start.date()] += (stop - start).total_seconds() / 3600
+                day_hours = defaultdict(float)
+                for start, stop, meta in intervals[resource.id]:
+                    day_hours[start.date()] += (stop - start).total_seconds() / 3600
+
+                # compute number of days as quarters
+                days = sum(
+                    float_utils.round(ROUNDING_FACTOR * day_hours[day] / day_total[day]) / ROUNDING_FACTOR
+                    for day in day_hours
+                )
+                result[record.id] = {
+                    'days': days,
+                    'hours': sum(day_hours.values()),
+                }
+        return result
@@ -77,3 +77,37 @@ class TestPayslipFlow(TestPayslipBase):
         # I print the contribution register report
         context = {'model': 'hr.contribution.register', 'active_ids': [self.ref('om_om_hr_payroll.hr_houserent_register')]}
         test_reports.try_report_action(self.env.cr, self.env.uid, 'action_payslip_lines_contribution_register', context=context, our_module='om_hr_payroll')
+
+    def test_01_salary_rule_code_change(self):
+        """ Changing the python code of a rule is taken into account on the next computation """
+        richard_payslip = self.env['hr.payslip'].create({
+            'name': 'Payslip of Richard',
+            'employee_id': self.richard_emp.id
+        })
+        richard_payslip.compute_sheet()
+        hra_line = richard_payslip.line_ids.filtered(lambda line: line.code == 'HRA')
+        self.assertAlmostEqual(hra_line.total, 2000.0)
+
+        # I change the base of the House Rent Allowance and compute the sheet again
+        self.env['hr.salary.rule'].browse(self.hra_rule_id).write({'amount_percentage_base': 'contract.wage / 2'})
+        richard_payslip.compute_sheet()
+        hra_line = richard_payslip.line_ids.filtered(lambda line: line.code == 'HRA')
+        self.assertAlmostEqual(hra_line.total, 1000.0)
+
+    def test_02_payslip_history(self):
+        """ The preloaded history gives the same sums as the database """
+        richard_payslip = self.env['hr.payslip'].create({
+            'name': 'Payslip of Richard',
+            'employee_id': self.richard_emp.id
+        })
+        richard_payslip.action_payslip_done()
+
+        next_payslip = self.env['hr.payslip'].create({
+            'name': 'Next Payslip of Richard',
+            'employee_id': self.richard_emp.id
+        })
+        history = next_payslip._get_payslip_history()
+        self.assertAlmostEqual(history.sum_lines(self.richard_emp.id, 'HRA', richard_payslip.date_from, richard_payslip.date_to)[0], 2000.0)
+        self.assertEqual(history.sum_lines(self.richard_emp.id, 'HRA', richard_payslip.date_to, richard_payslip.date_to), (None,))
+        # dates before the loaded window are left to the database
+        self.assertIsNone(history.sum_lines(self.richard_emp.id, 'HRA', '1990-01-01', richard_payslip.date_to))
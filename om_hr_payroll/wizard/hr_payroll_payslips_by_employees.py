@@ -1,9 +1,19 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-from odoo import api, fields, models, _
+import babel
+import logging
+from collections import defaultdict
+from datetime import datetime, time
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError
 
+_logger = logging.getLogger(__name__)
+
+# number of employees whose payslips are created and computed in one transaction
+PAYSLIP_BATCH_SIZE = 100
+
 
 class HrPayslipEmployees(models.TransientModel):
     _name = 'hr.payslip.employees'
@@ -11,31 +21,78 @@ class HrPayslipEmployees(models.TransientModel):
 
     employee_ids = fields.Many2many('hr.employee', 'hr_employee_group_rel', 'payslip_id', 'employee_id', 'Employees')
 
-    def compute_sheet(self):
-        payslips = self.env['hr.payslip']
-        [data] = self.read()
-        active_id = self.env.context.get('active_id')
-        if active_id:
-            [run_data] = self.env['hr.payslip.run'].browse(active_id).read(['date_start', 'date_end', 'credit_note'])
+    @api.model
+    def _get_payslips_values(self, employees, run_data, payslip_run_id):
+        """
+        Same values as hr.payslip.onchange_employee_id, for a set of employees: the contracts are
+        searched at once and the worked days are computed once per working schedule.
+        @return: returns the list of values to create the payslips of the employees
+        """
+        Payslip = self.env['hr.payslip']
         from_date = run_data.get('date_start')
         to_date = run_data.get('date_end')
-        if not data['employee_ids']:
-            raise UserError(_("You must select employee(s) to generate payslip(s)."))
-        for employee in self.env['hr.employee'].browse(data['employee_ids']):
-            slip_data = self.env['hr.payslip'].onchange_employee_id(from_date, to_date, employee.id, contract_id=False)
-            res = {
+        ttyme = datetime.combine(fields.Date.from_string(from_date), time.min)
+        locale = self.env.context.get('lang') or 'en_US'
+        period = tools.ustr(babel.dates.format_date(date=ttyme, format='MMMM-y', locale=locale))
+
+        contracts_by_employee = Payslip.get_contracts_by_employee(employees, from_date, to_date)
+        # the worked days and the inputs are only filled when the first contract has a structure
+        contract_ids = []
+        for employee in employees:
+            employee_contract_ids = contracts_by_employee.get(employee.id)
+            if employee_contract_ids and self.env['hr.contract'].browse(employee_contract_ids[0]).struct_id:
+                contract_ids += employee_contract_ids
+        worked_days_by_contract = defaultdict(list)
+        for worked_days in Payslip.get_worked_day_lines(self.env['hr.contract'].browse(contract_ids), from_date, to_date):
+            worked_days_by_contract[worked_days['contract_id']].append(worked_days)
+
+        vals_list = []
+        for employee in employees:
+            employee_contract_ids = contracts_by_employee.get(employee.id, [])
+            contract = self.env['hr.contract'].browse(employee_contract_ids[:1])
+            struct = contract.struct_id
+            worked_days_lines = []
+            input_lines = []
+            if struct:
+                contracts = self.env['hr.contract'].browse(employee_contract_ids)
+                for contract_id in employee_contract_ids:
+                    worked_days_lines += worked_days_by_contract[contract_id]
+                input_lines = Payslip.get_inputs(contracts, from_date, to_date)
+            vals_list.append({
                 'employee_id': employee.id,
-                'name': slip_data['value'].get('name'),
-                'struct_id': slip_data['value'].get('struct_id'),
-                'contract_id': slip_data['value'].get('contract_id'),
-                'payslip_run_id': active_id,
-                'input_line_ids': [(0, 0, x) for x in slip_data['value'].get('input_line_ids')],
-                'worked_days_line_ids': [(0, 0, x) for x in slip_data['value'].get('worked_days_line_ids')],
+                'name': _('Salary Slip of %s for %s') % (employee.name, period),
+                'struct_id': struct.id,
+                'contract_id': contract.id,
+                'payslip_run_id': payslip_run_id,
+                'input_line_ids': [(0, 0, x) for x in input_lines],
+                'worked_days_line_ids': [(0, 0, x) for x in worked_days_lines],
                 'date_from': from_date,
                 'date_to': to_date,
                 'credit_note': run_data.get('credit_note'),
                 'company_id': employee.company_id.id,
-            }
-            payslips += self.env['hr.payslip'].create(res)
-        payslips.compute_sheet()
+            })
+        return vals_list
+
+    def compute_sheet(self):
+        [data] = self.read()
+        active_id = self.env.context.get('active_id')
+        if active_id:
+            [run_data] = self.env['hr.payslip.run'].browse(active_id).read(['date_start', 'date_end', 'credit_note'])
+        if not data['employee_ids']:
+            raise UserError(_("You must select employee(s) to generate payslip(s)."))
+        employees = self.env['hr.employee'].browse(data['employee_ids'])
+        batch_size = int(self.env['ir.config_parameter'].sudo().get_param(
+            'om_hr_payroll.payslip_batch_size', PAYSLIP_BATCH_SIZE)) or len(employees)
+        # big runs are committed batch by batch, so that they don't hold one long transaction
+        commit = len(employees) > batch_size and not self.env.registry.in_test_mode()
+        for index in range(0, len(employees), batch_size):
+            batch_employees = employees[index:index + batch_size]
+            payslips = self.env['hr.payslip'].create(self._get_payslips_values(batch_employees, run_data, active_id))
+            payslips.compute_sheet()
+            _logger.info("Payslip batch %s: %s/%s employees processed", active_id,
+                         index + len(batch_employees), len(employees))
+            if commit:
+                payslips.flush()
+                self.env.cr.commit()
+                self.env['hr.payslip'].invalidate_cache()
         return {'type': 'ir.actions.act_window_close'}
@@ -2,6 +2,7 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools import float_compare
 
+from collections import defaultdict
 from itertools import groupby
 
 
@@ -17,68 +18,92 @@ class POSPayment(models.Model):
     tax_account_id = fields.Many2one('account.account', related='payment_method_id.tax_account_id',
                                      string='Account')
     fees_move_id = fields.Many2one('account.move', string='Fees Entry', readonly=1)
+    fees_line_ids = fields.Many2many('account.move.line', 'pos_payment_fees_move_line_rel', 'payment_id', 'line_id',
+                                     string='Fees Items', readonly=1,
+                                     help='Journal items holding the bank fees of this payment.')
+
+    def _get_fees_amounts(self):
+        """ Percent and fixed bank fees of the payment. """
+        self.ensure_one()
+        method = self.payment_method_id
+        percent = ((method.fees_percent / 100) * self.amount) if method.fees_percent > 0.0 else 0.0
+        return percent, method.fees_amount
 
     def create_fees_entry(self, percent, fixed):
-        total = 0.0
-        vals = []
-        if percent > 0.0:
-            total += percent
-            vals.append((0, 0, {
-                'name': 'Bank Percent Fees',
-                'account_id': self.fees_percent_account_id.id,
-                'debit': percent,
-                'credit': 0.0,
-                'journal_id': self.payment_method_id.fees_journal_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if fixed > 0.0:
-            total += fixed
-            vals.append((0, 0, {
-                'name': 'Bank Fixed Fees',
-                'account_id': self.fees_fixed_account_id.id,
-                'debit': fixed,
-                'credit': 0.0,
-                'journal_id': self.payment_method_id.fees_journal_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if total > 0.0:
-            tax = total * (self.tax_id.amount / 100)
-            vals.append((0, 0, {
-                'name': self.tax_id.description,
-                'account_id': self.tax_account_id.id,
-                'debit': tax,
-                'credit': 0.0,
-                'journal_id': self.payment_method_id.fees_journal_id.id,
-                'currency_id': self.payment_method_id.fees_journal_id.id,
-            }))
-            vals.append((0, 0, {
-                'name': 'Bank Fees',
-                'account_id': self.payment_method_id.fees_credit_account_id.id,
-                'debit': 0.0,
-                'credit': total + tax,
-                'journal_id': self.payment_method_id.fees_journal_id.id,
-                'currency_id': self.currency_id.id,
-            }))
-        if vals:
-            move_vals = {
-                'ref': _('Bank Fees %s') % self.session_id.name,
-                'date': self.payment_date,
-                'journal_id': self.payment_method_id.fees_journal_id.id,
-                'line_ids': vals,
-            }
-            fees_move_id = self.env['account.move'].create(move_vals)
-            fees_move_id.post()
-            self.fees_move_id = fees_move_id.id
+        self.session_id._create_fees_move(
+            self.payment_method_id.fees_journal_id, self.payment_date,
+            [(self.payment_method_id, self, percent, fixed)])
+
 
 class PosSession(models.Model):
     _inherit = 'pos.session'
 
+    def _create_fees_move(self, journal, date, groups, consolidated=False):
+        """ Create and post one bank fees entry for the given groups, a list
+        of ``(payment_method, payments, percent, fixed)``, and link each
+        payment to the entry and to the fees lines of its group. """
+        self.ensure_one()
+        line_vals = []
+        group_lines = []
+        for method, payments, percent, fixed in groups:
+            name_suffix = ' (%s)' % method.name if consolidated else ''
+            vals = method._prepare_fees_move_lines(percent, fixed, payments[:1].currency_id, name_suffix)
+            fees_count = (percent > 0.0) + (fixed > 0.0)
+            group_lines.append((payments, len(line_vals), fees_count))
+            line_vals += vals
+        if not line_vals:
+            return self.env['account.move']
+        fees_move = self.env['account.move'].create({
+            'ref': _('Bank Fees %s') % self.name,
+            'date': date,
+            'journal_id': journal.id,
+        })
+        lines = self.env['account.move.line'].with_context(check_move_validity=False).create([
+            dict(vals, move_id=fees_move.id) for vals in line_vals
+        ])
+        fees_move.action_post()
+        for payments, start, fees_count in group_lines:
+            if fees_count:
+                payments.write({
+                    'fees_move_id': fees_move.id,
+                    'fees_line_ids': [(6, 0, lines[start:start + fees_count].ids)],
+                })
+        return fees_move
+
+    def _create_bank_fees_entries(self):
+        """ Post the bank fees of the session payments, one entry per payment
+        or consolidated per payment method or fees journal depending on the
+        payment method. """
+        for session in self:
+            payments = self.env['pos.payment'].search([
+                ('session_id', '=', session.id), ('have_fees', '=', True), ('fees_move_id', '=', False),
+            ])
+            consolidated = defaultdict(lambda: defaultdict(list))
+            for payment in payments:
+                method = payment.payment_method_id
+                if method.fees_grouping == 'payment':
+                    percent, fixed = payment._get_fees_amounts()
+                    payment.create_fees_entry(percent, fixed)
+                    continue
+                key = method.fees_journal_id if method.fees_grouping == 'journal' else method
+                consolidated[key][method].append(payment.id)
+            date = fields.Date.context_today(session)
+            for key, payments_by_method in consolidated.items():
+                groups = []
+                for method, payment_ids in payments_by_method.items():
+                    method_payments = self.env['pos.payment'].browse(payment_ids)
+                    percent = fixed = 0.0
+                    for payment in method_payments:
+                        payment_percent, payment_fixed = payment._get_fees_amounts()
+                        percent += payment_percent
+                        fixed += payment_fixed
+                    groups.append((method, method_payments, percent, fixed))
+                journal = key if key._name == 'account.journal' else key.fees_journal_id
+                session._create_fees_move(journal, date, groups, consolidated=True)
 
     def _validate_session(self, balancing_account=False, amount_to_balance=0, bank_payment_method_diffs=None):
-        res = super(PosSession, self)._validate_session(balancing_account=False, amount_to_balance=0, bank_payment_method_diffs=None)
-        payments= self.env['pos.payment'].search([('session_id', '=', self.id), ('have_fees', '=', True)])
-        for payment in payments:
-            fees = ((payment.payment_method_id.fees_percent / 100) * payment.amount) if payment.payment_method_id.fees_percent > 0.0 else 0.0
-            commission = payment.payment_method_id.fees_amount
-            payment.create_fees_entry(fees, commission)
+        res = super(PosSession, self)._validate_session(balancing_account=balancing_account,
+                                                        amount_to_balance=amount_to_balance,
+                                                        bank_payment_method_diffs=bank_payment_method_diffs)
+        self._create_bank_fees_entries()
         return res
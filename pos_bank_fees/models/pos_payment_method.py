@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, _
 
 
 class PosPaymentMethod(models.Model):
@@ -15,4 +15,58 @@ class PosPaymentMethod(models.Model):
     tax_account_id = fields.Many2one('account.account', string='Tax Account')
     fees_percent = fields.Float('Fees (%)')
     fees_amount = fields.Float('Fees Fixed Amount')
+    fees_grouping = fields.Selection([
+        ('payment', 'One Entry per Payment'),
+        ('method', 'One Entry per Payment Method'),
+        ('journal', 'One Entry per Fees Journal'),
+    ], string='Fees Entries', default='payment', required=True,
+        help='Post the bank fees of a session with one journal entry per payment, or consolidated with one line '
+             'per fees account and one entry per payment method or per fees journal.')
+
+    def _prepare_fees_move_lines(self, percent, fixed, currency, name_suffix=''):
+        """ Journal items of the bank fees of this method: the percent and
+        fixed fees, their tax and the counterpart. The fees lines come first,
+        in that order. """
+        self.ensure_one()
+        total = 0.0
+        vals = []
+        if percent > 0.0:
+            total += percent
+            vals.append({
+                'name': _('Bank Percent Fees') + name_suffix,
+                'account_id': self.fees_percent_account_id.id,
+                'debit': percent,
+                'credit': 0.0,
+                'journal_id': self.fees_journal_id.id,
+                'currency_id': currency.id,
+            })
+        if fixed > 0.0:
+            total += fixed
+            vals.append({
+                'name': _('Bank Fixed Fees') + name_suffix,
+                'account_id': self.fees_fixed_account_id.id,
+                'debit': fixed,
+                'credit': 0.0,
+                'journal_id': self.fees_journal_id.id,
+                'currency_id': currency.id,
+            })
+        if total > 0.0:
+            tax = total * (self.tax_id.amount / 100)
+            vals.append({
+                'name': self.tax_id.description,
+                'account_id': self.tax_account_id.id,
+                'debit': tax,
+                'credit': 0.0,
+                'journal_id': self.fees_journal_id.id,
+                'currency_id': currency.id,
+            })
+            vals.append({
+                'name': _('Bank Fees') + name_suffix,
+                'account_id': self.fees_credit_account_id.id,
+                'debit': 0.0,
+                'credit': total + tax,
+                'journal_id': self.fees_journal_id.id,
+                'currency_id': currency.id,
+            })
+        return vals
 
@@ -49,56 +49,80 @@ class StagnantProductsReport(models.TransientModel):
             else:
                 raise ValidationError(_('"Please insert Date from and Date to'))
 
+    def _get_product_moves_data(self, products):
+        """ Sold/purchased quantities and last sale/purchase documents of the
+        period for all ``products`` at once, keyed by product id. """
+        if not products:
+            return {}
+        self.env['account.move.line'].flush(['date', 'quantity', 'product_id', 'move_id', 'company_id'])
+        self.env['account.move'].flush(['name', 'state', 'payment_state', 'move_type', 'journal_id'])
+        self.env['account.journal'].flush(['type'])
+        self.env.cr.execute("""
+            WITH lines AS (
+                SELECT aml.id, aml.product_id, aml.date, aml.quantity, am.name AS move_name,
+                       (am.move_type = 'out_invoice'
+                        AND am.payment_state IS DISTINCT FROM 'reversed') AS is_sale,
+                       (aj.type = 'purchase') AS is_purchase
+                  FROM account_move_line aml
+                  JOIN account_move am ON am.id = aml.move_id
+                  JOIN account_journal aj ON aj.id = am.journal_id
+                 WHERE aml.product_id IN %(product_ids)s
+                   AND aml.company_id IN %(company_ids)s
+                   AND aml.date >= %(date_from)s AND aml.date <= %(date_to)s
+                   AND am.state = 'posted'
+            ),
+            totals AS (
+                SELECT product_id,
+                       COUNT(*) FILTER (WHERE is_sale) AS sale_count,
+                       COALESCE(SUM(quantity) FILTER (WHERE is_sale), 0)::float AS sale_qty,
+                       COALESCE(SUM(quantity) FILTER (WHERE is_purchase), 0)::float AS purchase_qty
+                  FROM lines
+                 WHERE is_sale OR is_purchase
+                 GROUP BY product_id
+            ),
+            last_sale AS (
+                SELECT DISTINCT ON (product_id) product_id, date, move_name
+                  FROM lines
+                 WHERE is_sale
+                 ORDER BY product_id, date DESC, move_name DESC, id
+            ),
+            last_purchase AS (
+                SELECT DISTINCT ON (product_id) product_id, date, move_name
+                  FROM lines
+                 WHERE is_purchase
+                 ORDER BY product_id, date DESC, move_name DESC, id
+            )
+            SELECT t.product_id, t.sale_count, t.sale_qty, t.purchase_qty,
+                   ls.date AS last_sale_date, ls.move_name AS last_sale_name,
+                   lp.date AS last_purchase_date, lp.move_name AS last_purchase_name
+              FROM totals t
+              LEFT JOIN last_sale ls ON ls.product_id = t.product_id
+              LEFT JOIN last_purchase lp ON lp.product_id = t.product_id
+        """, {
+            'product_ids': tuple(products.ids),
+            'company_ids': tuple(self.env.companies.ids),
+            'date_from': self.date_from,
+            'date_to': self.date_to,
+        })
+        return {row['product_id']: row for row in self.env.cr.dictfetchall()}
+
     def get_products(self):
+        """ Return the stagnant products of the period together with their
+        movements data: products without sales, or sold no more than
+        ``sale_qty``. """
         domain = []
         if self.categ_ids:
             domain.append(('categ_id', 'in', self.categ_ids.ids))
         products = self.env['product.product'].search(domain)
-        result = []
-        for product in products:
-            sale_moves = self.env['account.move.line'].search(
-                [('date', '>=', self.date_from), ('date', '<=', self.date_to), ('move_id.state', '=', 'posted'),
-                 ('move_id.payment_state', '!=', 'reversed'),
-                 ('move_id.move_type', '=', 'out_invoice'), ('product_id', '=', product.id)], order='date desc')
-            if sale_moves:
-                if sum(sale_moves.mapped('quantity')) <= self.sale_qty:
-                    result.append(product)
-            else:
-                result.append(product)
-
-        return result
-
-    def get_sale_move(self, product):
-        sale_moves = self.env['account.move.line'].search(
-            [('date', '>=', self.date_from), ('date', '<=', self.date_to), ('move_id.state', '=', 'posted'),
-             ('move_id.payment_state', '!=', 'reversed'),
-             ('move_id.move_type', '=', 'out_invoice'), ('product_id', '=', product.id)], order='date desc')
-        sale_moves = sum(sale_moves.mapped('quantity'))
-        return sale_moves
-
-    def get_last_sale(self, product):
-        sale_move = self.env['account.move.line'].search(
-            [('date', '>=', self.date_from), ('date', '<=', self.date_to), ('move_id.state', '=', 'posted'),
-             ('move_id.payment_state', '!=', 'reversed'),
-             ('move_id.move_type', '=', 'out_invoice'), ('product_id', '=', product.id)], limit=1, order='date desc')
-        return sale_move
-
-    def get_purchase_move(self, product):
-        purchase_moves = self.env['account.move.line'].search(
-            [('date', '>=', self.date_from), ('date', '<=', self.date_to), ('move_id.state', '=', 'posted'),
-             ('move_id.journal_id.type', '=', 'purchase'), ('product_id', '=', product.id)], order='date desc')
-        purchase_moves = sum(purchase_moves.mapped('quantity'))
-        return purchase_moves
-
-    def get_last_purchase(self, product):
-        purchase_move = self.env['account.move.line'].search(
-            [('date', '>=', self.date_from), ('date', '<=', self.date_to), ('move_id.state', '=', 'posted'),
-             ('move_id.journal_id.type', '=', 'purchase'), ('product_id', '=', product.id)], limit=1, order='date desc')
-        return purchase_move
+        moves_data = self._get_product_moves_data(products)
+        result = products.filtered(
+            lambda p: not moves_data.get(p.id, {}).get('sale_count')
+            or moves_data[p.id]['sale_qty'] <= self.sale_qty)
+        return result, moves_data
 
     def generate_report(self):
         output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output)
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
 
         custom_format = workbook.add_format({
             'bold': 0,
@@ -155,34 +179,36 @@ class StagnantProductsReport(models.TransientModel):
         row = 4
         col = 0
 
-        if self.get_products():
-            total_qty = total_sale = total_purchase = 0.0
-            for line in self.get_products():
-                worksheet.write(row, col, str(line.name)+"["+str(line.barcode or "")+"]["+str(line.default_code or "")+"]", custom_format)
-                worksheet.write(row, col + 1, line.categ_id.name, custom_format)
-                last_sale = self.get_last_sale(line)
-                worksheet.write(row, col + 2, str(last_sale.date) if last_sale else "", custom_format)
-                worksheet.write(row, col + 3, last_sale.move_id.name if last_sale else "", custom_format)
-                last_purchase = self.get_last_purchase(line)
-                worksheet.write(row, col + 4, str(last_purchase.date) if last_purchase else "", custom_format)
-                worksheet.write(row, col + 5, last_purchase.move_id.name if last_purchase else "", custom_format)
-                total_sale += self.get_sale_move(line)
-                worksheet.write(row, col + 6, self.get_sale_move(line), custom_format)
-                total_purchase += self.get_purchase_move(line)
-                worksheet.write(row, col + 7, self.get_purchase_move(line), custom_format)
-                worksheet.write(row, col + 8, line.qty_available, custom_format)
-                total_qty += line.qty_available
-                row += 1
-            worksheet.write(row, col + 5, "الاجمالي", custom_format)
-            worksheet.write(row, col + 6, total_sale, custom_format)
-            worksheet.write(row, col + 7, total_purchase, custom_format)
-            worksheet.write(row, col + 8, total_qty, custom_format)
-        else:
+        products, moves_data = self.get_products()
+        if not products:
             raise ValidationError("Nothing to Print!")
+        quantities = products._compute_quantities_dict(
+            self._context.get('lot_id'), self._context.get('owner_id'), self._context.get('package_id'))
+        total_qty = total_sale = total_purchase = 0.0
+        for line in products:
+            data = moves_data.get(line.id, {})
+            qty_available = quantities[line.id]['qty_available']
+            worksheet.write(row, col, str(line.name)+"["+str(line.barcode or "")+"]["+str(line.default_code or "")+"]", custom_format)
+            worksheet.write(row, col + 1, line.categ_id.name, custom_format)
+            worksheet.write(row, col + 2, str(data['last_sale_date']) if data.get('last_sale_date') else "", custom_format)
+            worksheet.write(row, col + 3, data.get('last_sale_name') or "", custom_format)
+            worksheet.write(row, col + 4, str(data['last_purchase_date']) if data.get('last_purchase_date') else "", custom_format)
+            worksheet.write(row, col + 5, data.get('last_purchase_name') or "", custom_format)
+            total_sale += data.get('sale_qty', 0.0)
+            worksheet.write(row, col + 6, data.get('sale_qty', 0.0), custom_format)
+            total_purchase += data.get('purchase_qty', 0.0)
+            worksheet.write(row, col + 7, data.get('purchase_qty', 0.0), custom_format)
+            worksheet.write(row, col + 8, qty_available, custom_format)
+            total_qty += qty_available
+            row += 1
+        worksheet.write(row, col + 5, "الاجمالي", custom_format)
+        worksheet.write(row, col + 6, total_sale, custom_format)
+        worksheet.write(row, col + 7, total_purchase, custom_format)
+        worksheet.write(row, col + 8, total_qty, custom_format)
 
         workbook.close()
         output.seek(0)
-        self.write({'excel_sheet': base64.encodestring(output.getvalue())})
+        self.write({'excel_sheet': base64.encodebytes(output.getvalue())})
 
         return {
             'type': 'ir.actions.act_url',
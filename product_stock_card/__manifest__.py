@@ -17,6 +17,7 @@
 
     'data': [
         'security/ir.model.access.csv',
+        'security/stock_card_security.xml',
         'reports/stock_move_stock_card.xml',
         'wizards/stock_card_wizard_views.xml',
     ],
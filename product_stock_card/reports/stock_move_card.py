@@ -5,6 +5,7 @@ from odoo import api, fields, models, _
 class StockMoveStockCard(models.Model):
     _name = 'stock.move.stock.card'
 
+    user_id = fields.Many2one(comodel_name="res.users", string="User", index=True, default=lambda self: self.env.user, )
     date = fields.Date(string="Transaction Date", required=False, )
     product_id = fields.Many2one(comodel_name="product.product", string="Product", required=False, )
     location_id = fields.Many2one(comodel_name="stock.location", string="Location", required=False, )
@@ -61,170 +61,127 @@ class StockCardWizard(models.TransientModel):
              """ in the period.""")
 
     def delete_values_in_stock_move(self):
-        self.env.cr.execute(""" delete from stock_move_stock_card;
-                   """)
-
-    def update_values_in_stock_move(self,mvdate,product_id,location_id,initial_stock,product_in , product_out ,product_bal,val_bal, name):
-        self._cr.execute(""" INSERT INTO stock_move_stock_card (date,product_id , location_id,initial_stock,product_in, product_out,product_bal,val_bal, name) 
-                   VALUES """ + str((mvdate,product_id.id,location_id.id,initial_stock,product_in,product_out,product_bal,val_bal,name)) + """ RETURNING id as id; """ )
-        data = self.env.cr.dictfetchall()
-        id = 0
-        if data:
-            for rec in data:
-                id = rec.get('id') or 0
-        return id
+        # only the card of the current user, others may be looking at theirs
+        self.env.cr.execute(""" delete from stock_move_stock_card where user_id = %s;
+                   """, (self.env.uid,))
+
+    def _get_stock_card_product_where(self):
+        """ SQL condition (on the product template pt and the move m) and params of the product filter """
+        if self.filter_by == 'product' and self.products:
+            return "AND m.product_id IN %(product_ids)s", {'product_ids': tuple(self.products.ids)}
+        if self.filter_by == 'category' and self.category:
+            return (
+                "AND pt.categ_id IN (SELECT id FROM product_category WHERE parent_path LIKE %(categ_path)s)",
+                {'categ_path': self.category.parent_path + '%'})
+        return "", {}
+
+    def _insert_stock_card_lines(self):
+        """ Compute the card of the moves done in the location (and its children) during the period,
+        and insert it for the current user.
+
+        The stock at the end of the period is the quantity on hand minus the moves done since then,
+        the initial stock is this quantity minus the moves of the period (in the product unit of measure),
+        and the balance of each line is the running sum of the moves from the initial stock.
+        """
+        if not self.env.user.tz:
+            raise Warning(ERREUR_FUSEAU)
+        self.env['stock.move'].flush()
+        self.env['stock.quant'].flush()
+        product_where, params = self._get_stock_card_product_where()
+        params.update({
+            'parent_path': self.location_id.parent_path + '%',
+            'date_start': self.date_start,
+            'date_end': self.date_end,
+            'now': fields.Datetime.now(),
+            'location_id': self.location_id.id,
+            'user_id': self.env.uid,
+            'tz': self.env.user.tz,
+        })
+        self._cr.execute("""
+            WITH locations AS (
+                SELECT id FROM stock_location WHERE parent_path LIKE %(parent_path)s
+            ),
+            moves AS (
+                SELECT m.id, m.product_id, m.date, m.name, m.picking_id, pt.name AS product_name,
+                       m.product_uom_qty AS qty,
+                       m.product_uom_qty * pu.factor / mu.factor AS product_qty,
+                       m.location_dest_id IN (SELECT id FROM locations) AS is_in,
+                       m.location_id IN (SELECT id FROM locations) AS is_out,
+                       m.date <= %(date_end)s AS in_period,
+                       m.date >= %(date_end)s AND m.date <= %(now)s AS to_now
+                FROM stock_move m
+                JOIN product_product pp ON pp.id = m.product_id
+                JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                JOIN uom_uom pu ON pu.id = pt.uom_id
+                JOIN uom_uom mu ON mu.id = m.product_uom
+                WHERE m.state = 'done'
+                  AND m.date >= %(date_start)s
+                  AND m.date <= GREATEST(%(date_end)s, %(now)s)
+                  AND (m.location_dest_id IN (SELECT id FROM locations)
+                       OR m.location_id IN (SELECT id FROM locations))
+                  """ + product_where + """
+            ),
+            initial AS (
+                SELECT t.product_id,
+                       COALESCE((SELECT SUM(q.quantity) FROM stock_quant q
+                                 WHERE q.product_id = t.product_id
+                                   AND q.location_id IN (SELECT id FROM locations)), 0)
+                       + t.tonow_out - t.tonow_in - t.period_in + t.period_out AS stock_init
+                FROM (
+                    SELECT product_id,
+                           SUM(CASE WHEN in_period AND is_in THEN product_qty ELSE 0 END) AS period_in,
+                           SUM(CASE WHEN in_period AND is_out THEN product_qty ELSE 0 END) AS period_out,
+                           SUM(CASE WHEN to_now AND is_in THEN product_qty ELSE 0 END) AS tonow_in,
+                           SUM(CASE WHEN to_now AND is_out THEN product_qty ELSE 0 END) AS tonow_out
+                    FROM moves
+                    GROUP BY product_id
+                ) t
+            ),
+            lines AS (
+                SELECT moves.*,
+                       CASE WHEN is_in THEN qty ELSE 0 END AS val_in,
+                       CASE WHEN is_out THEN qty ELSE 0 END AS val_out
+                FROM moves
+                WHERE in_period AND NOT to_now
+            )
+            INSERT INTO stock_move_stock_card (
+                user_id, date, product_id, location_id, initial_stock, product_in, product_out,
+                product_bal, val_bal, name, picking_id, partner_id, transaction_type,
+                create_uid, create_date, write_uid, write_date)
+            SELECT %(user_id)s,
+                   (l.date AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s)::date,
+                   l.product_id,
+                   %(location_id)s,
+                   CASE WHEN ROW_NUMBER() OVER w = 1 THEN i.stock_init ELSE 0 END,
+                   l.val_in,
+                   l.val_out,
+                   i.stock_init + SUM(l.val_in - l.val_out) OVER w,
+                   l.val_in - l.val_out,
+                   COALESCE(NULLIF(p.name, ''), NULLIF(l.name, ''), '-'),
+                   p.id,
+                   p.partner_id,
+                   CASE WHEN l.val_in != 0 THEN 'in' WHEN l.val_out != 0 THEN 'out' END,
+                   %(user_id)s, NOW() AT TIME ZONE 'UTC', %(user_id)s, NOW() AT TIME ZONE 'UTC'
+            FROM lines l
+            JOIN initial i ON i.product_id = l.product_id
+            LEFT JOIN stock_picking p ON p.id = l.picking_id
+            WINDOW w AS (PARTITION BY l.product_id ORDER BY l.date, l.id)
+            ORDER BY l.product_name, l.product_id, l.date, l.id
+        """, params)
+        self.env['stock.move.stock.card'].invalidate_cache()
 
     def open_product_stock_card(self):
         self.delete_values_in_stock_move()
-        stock_move = self.env['stock.move.stock.card']
-        quant_obj = self.env["stock.quant"].search([])
-        products = self.env['product.product'].search([])
-        start = self.date_start
-        end = self.date_end
-        location_id = self.location_id.id
-        category_id = self.category.id if self.category else None
-        filter_products =  self.products.mapped('id')
-        is_zero = self.is_zero
-        filter_by = self.filter_by
-        quant_domain = [('location_id', 'child_of', location_id)]
-        moves_domain = [
-            ('date', '>=', start),
-            ('date', '<=', end),
-            ('state', '=', 'done'),
-            '|',
-            ('location_dest_id', 'child_of', location_id),
-            ('location_id', 'child_of', location_id)]
-        moves_now_domain = [
-            ('date', '>=', end),
-            ('date', '<=', fields.Datetime.now()),
-            ('state', '=', 'done'),
-            '|',
-            ('location_dest_id', 'child_of', location_id),
-            ('location_id', 'child_of', location_id)]
-
-        if filter_by == 'product' and filter_products:
-            quant_domain.append(('product_id', 'in', filter_products))
-            moves_domain.append(('product_id', 'in', filter_products))
-            moves_now_domain.append(('product_id', 'in', filter_products))
-
-        elif filter_by == 'category' and category_id:
-            quant_domain.append(('product_id.categ_id', 'child_of', category_id))
-            moves_domain.append(('product_id.categ_id', 'child_of', category_id))
-            moves_now_domain.append(('product_id.categ_id', 'child_of', category_id))
-
-        quants = quant_obj.search(quant_domain)
-        moves = self.env['stock.move'].search(moves_domain)
-        moves_to_now = self.env['stock.move'].search(moves_now_domain)
-
-        location = self.env['stock.location'].browse(location_id)
-        location_ids = self.env['stock.location'].search([
-            ('parent_path', '=like', location.parent_path + "%")])
-
-        mv_in = moves.filtered(
-            lambda x: x.location_dest_id.id in location_ids.ids)
-        mv_out = moves.filtered(
-            lambda x: x.location_id.id in location_ids.ids)
-        mv_tonow_in = moves_to_now.filtered(
-            lambda x: x.location_dest_id.id in location_ids.ids)
-        mv_tonow_out = moves_to_now.filtered(
-            lambda x: x.location_id.id in location_ids.ids)
-
-        products |= quants.mapped('product_id')
-        products |= mv_in.mapped("product_id")
-        products |= mv_out.mapped("product_id")
-        products_with_initial = []
-        for product in products.sorted(lambda r: r.name):
-            line = {}
-            mv_in_pro = mv_in.filtered(
-                lambda x: x.product_id.id == product.id)
-            mv_out_pro = mv_out.filtered(
-                lambda x: x.product_id.id == product.id)
-            mv_tonow_in_pro = mv_tonow_in.filtered(
-                lambda x: x.product_id.id == product.id)
-            mv_tonow_out_pro = mv_tonow_out.filtered(
-                lambda x: x.product_id.id == product.id)
-
-            if not is_zero and not mv_in_pro and not mv_out_pro:
-                continue
-
-            product_uom = product.uom_id
-            tot_in = 0
-            for elt in mv_in_pro:
-                if product_uom.id != elt.product_uom.id:
-                    factor = product_uom.factor / elt.product_uom.factor
-                else:
-                    factor = 1.0
-                tot_in += elt.product_uom_qty * factor
-
-            tot_out = 0
-            for elt in mv_out_pro:
-                if product_uom.id != elt.product_uom.id:
-                    factor = product_uom.factor / elt.product_uom.factor
-                else:
-                    factor = 1.0
-                tot_out += elt.product_uom_qty * factor
-
-            tot_tonow_in = 0
-            for elt in mv_tonow_in_pro:
-                if product_uom.id != elt.product_uom.id:
-                    factor = product_uom.factor / elt.product_uom.factor
-                else:
-                    factor = 1.0
-                tot_tonow_in += elt.product_uom_qty * factor
-
-            tot_tonow_out = 0
-            for elt in mv_tonow_out_pro:
-                if product_uom.id != elt.product_uom.id:
-                    factor = product_uom.factor / elt.product_uom.factor
-                else:
-                    factor = 1.0
-                tot_tonow_out += elt.product_uom_qty * factor
-
-            actual_qty = product.with_context(
-                {'location': location_id}).qty_available
-            actual_qty += tot_tonow_out - tot_tonow_in
-
-            stock_init = actual_qty - tot_in + tot_out
-
-            move_in_show = mv_in_pro - mv_tonow_in_pro
-            move_out_show = mv_out_pro - mv_tonow_out_pro
-
-            move_to_show = self.env['stock.move']
-            move_to_show |= move_in_show
-            move_to_show |= move_out_show
-            move_to_show.sorted(lambda r: r.date)
-            val_in = actual_qty - tot_in + tot_out
-            val_fin = val_in
-
-            for mv in move_to_show:
-                if str(product.name) + str(stock_init) in products_with_initial:
-                    stock_init = 0
-                else:
-                    products_with_initial.append(str(product.name) + str(stock_init))
-
-                src = mv.location_id.id
-                dst = mv.location_dest_id.id
-                qty = mv.product_uom_qty
-
-                val_in = qty if dst in location_ids.ids else 0
-                val_out = qty if src in location_ids.ids else 0
-                val_bal = val_in - val_out
-                val_fin += val_bal
-
-                mvdate = convert_UTC_TZ(self, mv.date) if mv.date else ""
-                mvname = mv.picking_id.name or mv.name or "-"
-
-                stock_move_created = self.update_values_in_stock_move(mvdate,product,location ,stock_init,val_in,val_out,val_fin,val_bal,mvname)
-                our_move = stock_move.browse(stock_move_created)
-                our_move.check_in_out()
-                our_move._get_picking_id()
-
+        self._insert_stock_card_lines()
         return {
                 'name': "Product Stock Card",
                 'view_mode': 'tree,form',
                 'res_model': 'stock.move.stock.card',
                 'type': 'ir.actions.act_window',
                 'target': 'current',
+                'domain': [('user_id', '=', self.env.uid)],
+                # grouped by product, so that the card is loaded one product at a time
+                'context': {'group_by': 'product_id'},
             }
 
     @api.onchange('filter_by')
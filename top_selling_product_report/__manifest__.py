@@ -21,14 +21,14 @@
 #############################################################################
 {
     'name': 'Top/Least Selling Product Report',
-    'version': '15.0.1.0.0',
+    'version': '15.0.1.1.0',
     'summary': 'Top Selling and Least Selling Product Reports',
     'description': 'Top Selling Products,Fast Moving Products,Most Selling Products,Top Growing Products,Least Selling Products,',
     'author': 'Cybrosys Techno solutions',
     'maintainer': 'Cybrosys Techno Solutions',
     'company': 'Cybrosys Techno Solutions',
     'website': 'https://www.cybrosys.com',
-    'depends': ['base', 'sale_management', 'stock', 'sale'],
+    'depends': ['base', 'sale_management', 'stock', 'sale', 'sale_stock'],
     'category': 'Sale',
     'data': ['wizard/top_selling_wizard.xml',
              'report/top_selling_report.xml',
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author:Cybrosys Techno Solutions(odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU AFFERO
+#    GENERAL PUBLIC LICENSE (AGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU AFFERO GENERAL PUBLIC LICENSE (AGPL v3) for more details.
+#
+#    You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+#    (AGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+from odoo import api, models
+
+from .top_selling_daily import ROLLUP_ORDER_STATES
+
+ROLLUP_ORDER_FIELDS = {'date_order', 'company_id', 'warehouse_id', 'currency_rate', 'state'}
+ROLLUP_LINE_FIELDS = {'product_id', 'product_uom', 'product_uom_qty', 'price_unit', 'discount', 'tax_id'}
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def _get_top_selling_keys(self):
+        """ Rollup keys ``(day, company_id, warehouse_id)`` of the confirmed
+        orders of ``self``. Confirmation, cancellation and locking all go
+        through :meth:`write`, which refreshes the keys before and after. """
+        return {
+            (order.date_order and order.date_order.date(), order.company_id.id, order.warehouse_id.id)
+            for order in self if order.state in ROLLUP_ORDER_STATES
+        }
+
+    def write(self, vals):
+        if not ROLLUP_ORDER_FIELDS.intersection(vals):
+            return super(SaleOrder, self).write(vals)
+        keys = self._get_top_selling_keys()
+        res = super(SaleOrder, self).write(vals)
+        keys |= self._get_top_selling_keys()
+        self.env['top.selling.daily']._refresh_rollup(keys)
+        return res
+
+
+class SaleOrderLine(models.Model):
+    _inherit = 'sale.order.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(SaleOrderLine, self).create(vals_list)
+        self.env['top.selling.daily']._refresh_rollup(lines.order_id._get_top_selling_keys())
+        return lines
+
+    def write(self, vals):
+        res = super(SaleOrderLine, self).write(vals)
+        if ROLLUP_LINE_FIELDS.intersection(vals):
+            self.env['top.selling.daily']._refresh_rollup(self.order_id._get_top_selling_keys())
+        return res
+
+    def unlink(self):
+        keys = self.order_id._get_top_selling_keys()
+        res = super(SaleOrderLine, self).unlink()
+        self.env['top.selling.daily']._refresh_rollup(keys)
+        return res
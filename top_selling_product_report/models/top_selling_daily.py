@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>).
+#    Author:Cybrosys Techno Solutions(odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU AFFERO
+#    GENERAL PUBLIC LICENSE (AGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU AFFERO GENERAL PUBLIC LICENSE (AGPL v3) for more details.
+#
+#    You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+#    (AGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+from odoo import api, fields, models, tools
+
+ROLLUP_ORDER_STATES = ('sale', 'done')
+
+
+class TopSellingDaily(models.Model):
+    _name = 'top.selling.daily'
+    _description = 'Daily sold quantities per product'
+    _order = 'date desc, id'
+    _log_access = False
+
+    date = fields.Date(string='Day', required=True, readonly=True, index=True)
+    product_id = fields.Many2one('product.product', string='Product', required=True, readonly=True,
+                                 ondelete='cascade')
+    product_uom = fields.Many2one('uom.uom', string='UoM', readonly=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True,
+                                 ondelete='cascade')
+    warehouse_id = fields.Many2one('stock.warehouse', string='Warehouse', readonly=True, ondelete='cascade')
+    qty = fields.Float(string='Sold Quantity', readonly=True)
+    amount = fields.Float(string='Untaxed Amount', readonly=True)
+
+    def init(self):
+        tools.create_index(self._cr, 'top_selling_daily_company_date_index',
+                           self._table, ['company_id', 'date'])
+        self._cr.execute("SELECT 1 FROM top_selling_daily LIMIT 1")
+        if not self._cr.fetchone():
+            self._fill_rollup()
+
+    def _fill_rollup(self, where='', params=()):
+        """ Aggregate the confirmed sale order lines matching ``where`` into the
+        rollup table, one row per product, uom, company, warehouse and day. """
+        self._cr.execute("""
+            INSERT INTO top_selling_daily (date, product_id, product_uom, company_id, warehouse_id, qty, amount)
+            SELECT so.date_order::DATE, sl.product_id, sl.product_uom, so.company_id, so.warehouse_id,
+                   SUM(sl.product_uom_qty),
+                   SUM(sl.price_subtotal / COALESCE(NULLIF(so.currency_rate, 0), 1.0))
+              FROM sale_order_line sl
+              JOIN sale_order so ON sl.order_id = so.id
+             WHERE so.state IN %s
+               AND sl.product_id IS NOT NULL
+               AND sl.display_type IS NULL
+               {where}
+             GROUP BY so.date_order::DATE, sl.product_id, sl.product_uom, so.company_id, so.warehouse_id
+        """.format(where=where), (ROLLUP_ORDER_STATES,) + tuple(params))
+
+    @api.model
+    def _refresh_rollup(self, keys):
+        """ Recompute the rollup rows of the given ``(day, company_id,
+        warehouse_id)`` keys from the sale order lines. """
+        keys = {(day, company_id, warehouse_id or 0) for day, company_id, warehouse_id in keys if day}
+        if not keys:
+            return
+        self.env['sale.order'].flush(['date_order', 'state', 'company_id', 'warehouse_id', 'currency_rate'])
+        self.env['sale.order.line'].flush(['product_id', 'product_uom', 'product_uom_qty', 'price_subtotal',
+                                           'display_type', 'order_id'])
+        keys = tuple(keys)
+        days = [key[0] for key in keys]
+        self._cr.execute("""
+            DELETE FROM top_selling_daily
+             WHERE (date, company_id, COALESCE(warehouse_id, 0)) IN %s
+        """, (keys,))
+        self._fill_rollup("""
+               AND so.date_order >= %s AND so.date_order < %s::DATE + 1
+               AND (so.date_order::DATE, so.company_id, COALESCE(so.warehouse_id, 0)) IN %s
+        """, (min(days), max(days), keys))
+        self.invalidate_cache()
+
+    @api.model
+    def _rebuild_rollup(self):
+        """ Drop and recompute the whole rollup table. """
+        self.env['sale.order'].flush()
+        self.env['sale.order.line'].flush()
+        self._cr.execute("DELETE FROM top_selling_daily")
+        self._fill_rollup()
+        self.invalidate_cache()
@@ -94,23 +94,30 @@ class CustomReport(models.AbstractModel):
             'date_selected_to': date_selected_to,
         })
 
-        cr = self._cr
         order = 'asc' if data['least'] else 'desc'
-        company_id = str(tuple(company_id)) if len(company_id) > 1 else "(" + str(company_id[0]) + ")"
-        warehouse_id = str(tuple(warehouse_id)) if len(warehouse_id) > 1 else "(" + str(warehouse_id[0]) + ")"
-        limit_clause = " limit'%s'" % limit_value if limit_value else ""
-
-        query = ("""select sl.name as product_name,sum(product_uom_qty),pu.name from sale_order_line sl 
-                   JOIN sale_order so ON sl.order_id = so.id 
-                   JOIN uom_uom pu on sl.product_uom = pu.id
-                   where so.date_order::DATE >= '%s'::DATE and 
-                   so.date_order::DATE <= '%s'::DATE and 
-                   sl.state = 'sale' and so.company_id in %s 
-                   and so.warehouse_id in %s
-                   group by sl.name,pu.name order by sum %s""" % (
-            from_date, to_date, company_id, warehouse_id, order)) + limit_clause
-        cr.execute(query)
-        dat = cr.dictfetchall()
+        limit = int(limit_value) if limit_value and str(limit_value).strip().isdigit() else None
+
+        self._cr.execute("""
+            SELECT product_id, product_uom, SUM(qty) AS sum
+              FROM top_selling_daily
+             WHERE date >= %s AND date <= %s
+               AND company_id IN %s
+               AND warehouse_id IN %s
+             GROUP BY product_id, product_uom
+             ORDER BY sum {order}, product_id
+             LIMIT %s
+        """.format(order=order), (from_date, to_date, tuple(company_id), tuple(warehouse_id), limit))
+        rows = self._cr.dictfetchall()
+
+        products = self.env['product.product'].browse([row['product_id'] for row in rows])
+        uoms = self.env['uom.uom'].browse([row['product_uom'] for row in rows if row['product_uom']])
+        product_names = dict(products.with_context(active_test=False).name_get())
+        uom_names = {uom.id: uom.name for uom in uoms}
+        dat = [{
+            'product_name': product_names.get(row['product_id'], ''),
+            'sum': row['sum'],
+            'name': uom_names.get(row['product_uom'], ''),
+        } for row in rows]
 
         return {
             'data': dat,